@@ -0,0 +1,9 @@
+"""
+Offline benchmarks for the records-to-PDF pipeline
+
+Run from the project root:
+    python -m benchmarks.run --records 500 --items 5 --output bench.json
+
+MySQL is replaced by SQLite, MongoDB by an in-memory store and the SMTP
+server by a local stand-in, so no external services are needed.
+"""
@@ -0,0 +1,100 @@
+"""
+Bytes per invoice against render time for each PDF compression setting
+
+    python -m benchmarks.compression --records 300
+    python -m benchmarks.compression --logo flate,jpeg75 --ascii85 off
+
+Every combination of output.page_compression, output.ascii85 and logo
+encoding renders the same synthetic invoices in a fresh process.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run import PROJECT_ROOT, run_isolated
+
+# Logo encodings: output.logo_dpi and output.logo_jpeg_quality
+LOGO_VARIANTS: Dict[str, Dict[str, Any]] = {
+    'flate': {'logo_dpi': 150, 'logo_jpeg_quality': None},
+    'flate72': {'logo_dpi': 72, 'logo_jpeg_quality': None},
+    'jpeg75': {'logo_dpi': 150, 'logo_jpeg_quality': 75},
+    'jpeg50': {'logo_dpi': 72, 'logo_jpeg_quality': 50}
+}
+SWITCHES = {'on': True, 'off': False}
+
+def parse_choices(parser: argparse.ArgumentParser, value: str, choices) -> List[str]:
+    selected = [choice.strip() for choice in value.split(',') if choice.strip()]
+    unknown = [choice for choice in selected if choice not in choices]
+    if unknown:
+        parser.error(f"Unknown choices {unknown}; expected some of {list(choices)}")
+    return selected
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=50, help='Number of synthetic customers')
+    parser.add_argument('--records', type=int, default=300, help='Number of invoices per combination')
+    parser.add_argument('--items', type=int, default=5, help='Line items per invoice')
+    parser.add_argument('--page-compression', default='on,off', help='Comma separated subset of on,off')
+    parser.add_argument('--ascii85', default='on,off', help='Comma separated subset of on,off')
+    parser.add_argument('--logo', default=','.join(LOGO_VARIANTS), help=f"Comma separated subset of {list(LOGO_VARIANTS)}")
+    parser.add_argument('--output', help='JSON results path (default: output/benchmarks/compression_<timestamp>.json)')
+    args = parser.parse_args(argv)
+    
+    combinations = list(itertools.product(
+        parse_choices(parser, args.page_compression, SWITCHES),
+        parse_choices(parser, args.ascii85, SWITCHES),
+        parse_choices(parser, args.logo, LOGO_VARIANTS)
+    ))
+    
+    results = []
+    for page_compression, ascii85, logo in combinations:
+        print(f"Rendering {args.records} invoices (compression {page_compression}, "
+              f"ascii85 {ascii85}, logo {logo})...", flush=True)
+        # The PDF cache is off so every invoice is really rendered
+        overrides = {
+            'output': dict(LOGO_VARIANTS[logo], page_compression=SWITCHES[page_compression],
+                           ascii85=SWITCHES[ascii85]),
+            'cache': {'enabled': False}
+        }
+        result = run_isolated('render', {
+            'customers': args.customers,
+            'records': args.records,
+            'items': args.items,
+            'overrides': overrides
+        })
+        result.update(page_compression=page_compression, ascii85=ascii85, logo=logo,
+                      ms_per_invoice=round(result['seconds'] * 1000 / max(1, result['invoices']), 3))
+        results.append(result)
+    
+    print()
+    header = f"{'compress':<10}{'ascii85':<9}{'logo':<9}{'bytes/inv':>11}{'ms/inv':>9}{'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for result in sorted(results, key=lambda item: item['bytes_per_invoice']):
+        print(f"{result['page_compression']:<10}{result['ascii85']:<9}{result['logo']:<9}"
+              f"{result['bytes_per_invoice']:>11}{result['ms_per_invoice']:>9}{result['p99_ms']:>9}")
+    
+    report = {
+        'benchmark': 'compression',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': vars(args),
+        'results': results
+    }
+    output_path = args.output or os.path.join(
+        PROJECT_ROOT, 'output', 'benchmarks', f"compression_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Render single invoices with very many line items, paged vs one big table
+
+    python -m benchmarks.large_invoice --items 10,1000,10000
+
+Each case runs in a fresh process so peak RSS belongs to that render alone.
+The "single" variant sets output.paged_items_table to false, which puts every
+item into one platypus Table as before.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run import PROJECT_ROOT, iter_invoices, peak_rss_mb, write_config
+
+VARIANTS = {'single': False, 'paged': True}
+
+def render_large(items: int, paged: bool) -> Dict[str, Any]:
+    """Entry point inside the per-case child process"""
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(PROJECT_ROOT)
+    from src.config_manager import ConfigManager
+    from src.pdf_generator import PDFGenerator
+    
+    work_dir = tempfile.mkdtemp(prefix='invoice_bench_large_')
+    try:
+        generator = PDFGenerator(ConfigManager(write_config(
+            work_dir, overrides={'output': {'paged_items_table': paged}})))
+        invoice = next(iter_invoices({'customers': 1, 'records': 1, 'items': items}))
+        
+        started = time.perf_counter()
+        pdf_path = generator.generate_invoice(invoice)
+        seconds = time.perf_counter() - started
+        with open(pdf_path, 'rb') as f:
+            pages = len(re.findall(rb'/Type /Page\b', f.read()))
+        return {
+            'items': items,
+            'seconds': round(seconds, 4),
+            'pages': pages,
+            'bytes': os.path.getsize(pdf_path),
+            'peak_rss_mb': peak_rss_mb()
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_case(items: int, paged: bool) -> Dict[str, Any]:
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(render_large, items, paged).result()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', default='10,1000,10000', help='Comma separated line item counts')
+    parser.add_argument('--variants', default=','.join(VARIANTS), help=f"Comma separated subset of {list(VARIANTS)}")
+    parser.add_argument('--output', help='JSON results path (default: output/benchmarks/large_invoice_<timestamp>.json)')
+    args = parser.parse_args(argv)
+    
+    counts = [int(count) for count in args.items.split(',') if count.strip()]
+    variants = [variant.strip() for variant in args.variants.split(',') if variant.strip()]
+    unknown = [variant for variant in variants if variant not in VARIANTS]
+    if unknown:
+        parser.error(f"Unknown variants: {', '.join(unknown)}")
+    
+    results = []
+    for count in counts:
+        for variant in variants:
+            print(f"Rendering {count} items ({variant})...", flush=True)
+            result = run_case(count, VARIANTS[variant])
+            result['variant'] = variant
+            results.append(result)
+    
+    print()
+    header = f"{'items':>8}  {'variant':<8}{'seconds':>10}{'pages':>8}{'KB':>10}{'RSS MB':>10}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(f"{result['items']:>8}  {result['variant']:<8}{result['seconds']:>10}{result['pages']:>8}"
+              f"{result['bytes'] // 1024:>10}{result['peak_rss_mb'] or '-':>10}")
+    
+    report = {
+        'benchmark': 'large_invoice',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': vars(args),
+        'results': results
+    }
+    output_path = args.output or os.path.join(
+        PROJECT_ROOT, 'output', 'benchmarks', f"large_invoice_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Measure the rendered PDF cache: a cold batch, a rerun of the same batch and
+repeated in-memory previews
+
+    python -m benchmarks.pdf_cache --records 500
+
+The rerun uses a new PDFGenerator on the same cache folder, as a retried
+batch in a new process would.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run import PROJECT_ROOT, iter_invoices, write_config
+
+def run_passes(params: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Entry point inside the child process"""
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(PROJECT_ROOT)
+    from src.config_manager import ConfigManager
+    from src.pdf_generator import PDFGenerator
+
+    work_dir = tempfile.mkdtemp(prefix='invoice_bench_pdf_cache_')
+    try:
+        config_path = write_config(work_dir, overrides={'cache': {'enabled': True}})
+        invoices = list(iter_invoices(params))
+        results = {}
+
+        for name, render in (('cold', 'file'), ('rerun', 'file'), ('preview', 'bytes')):
+            generator = PDFGenerator(ConfigManager(config_path))
+            started = time.perf_counter()
+            for invoice in invoices:
+                if render == 'file':
+                    generator.generate_invoice(invoice)
+                else:
+                    generator.render_to_bytes(invoice)
+            seconds = time.perf_counter() - started
+            results[name] = dict(generator.cache.stats(), seconds=round(seconds, 4),
+                                 ms_per_invoice=round(seconds * 1000 / max(1, len(invoices)), 3))
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=50, help='Number of synthetic customers')
+    parser.add_argument('--records', type=int, default=500, help='Number of invoices')
+    parser.add_argument('--items', type=int, default=5, help='Line items per invoice')
+    parser.add_argument('--output', help='JSON results path (default: output/benchmarks/pdf_cache_<timestamp>.json)')
+    args = parser.parse_args(argv)
+
+    params = {'customers': args.customers, 'records': args.records, 'items': args.items}
+    print(f"Rendering {args.records} invoices three times...", flush=True)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        results = executor.submit(run_passes, params).result()
+
+    print()
+    print(f"{'pass':<10}{'seconds':>10}{'ms/inv':>10}{'hits':>8}{'misses':>8}{'cache KB':>10}")
+    for name, result in results.items():
+        print(f"{name:<10}{result['seconds']:>10}{result['ms_per_invoice']:>10}"
+              f"{result['hits']:>8}{result['misses']:>8}{result['bytes'] // 1024:>10}")
+
+    report = {
+        'benchmark': 'pdf_cache',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': vars(args),
+        'passes': results
+    }
+    output_path = args.output or os.path.join(
+        PROJECT_ROOT, 'output', 'benchmarks', f"pdf_cache_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Compare PDF rendering with and without the static header/logo/style cache
+
+    python -m benchmarks.render_cache --records 1000
+
+Both variants render the same synthetic invoices in a fresh process; the
+uncached variant sets output.cache_static to false.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from benchmarks.run import PROJECT_ROOT, run_isolated
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=50, help='Number of synthetic customers')
+    parser.add_argument('--records', type=int, default=1000, help='Number of invoices to render')
+    parser.add_argument('--items', type=int, default=5, help='Line items per invoice')
+    parser.add_argument('--output', help='JSON results path (default: output/benchmarks/render_cache_<timestamp>.json)')
+    args = parser.parse_args(argv)
+    
+    results = {}
+    for variant, cache_static in (('uncached', False), ('cached', True)):
+        print(f"Rendering {args.records} invoices ({variant})...", flush=True)
+        results[variant] = run_isolated('render', {
+            'customers': args.customers,
+            'records': args.records,
+            'items': args.items,
+            'overrides': {'output': {'cache_static': cache_static}}
+        })
+    
+    print()
+    print(f"{'variant':<10}{'seconds':>10}{'inv/sec':>10}{'p50 ms':>10}{'p99 ms':>10}{'ms/inv':>10}")
+    for variant, result in results.items():
+        per_invoice = result['seconds'] * 1000 / max(1, result['invoices'])
+        result['ms_per_invoice'] = round(per_invoice, 3)
+        print(f"{variant:<10}{result['seconds']:>10}{result['invoices_per_sec']:>10}"
+              f"{result['p50_ms']:>10}{result['p99_ms']:>10}{per_invoice:>10.3f}")
+    
+    saving = results['uncached']['ms_per_invoice'] - results['cached']['ms_per_invoice']
+    print(f"\nSaving per invoice: {saving:.3f} ms "
+          f"({saving * 100 / results['uncached']['ms_per_invoice']:.1f}%)")
+    
+    report = {
+        'benchmark': 'render_cache',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': vars(args),
+        'variants': results,
+        'saving_ms_per_invoice': round(saving, 3)
+    }
+    output_path = args.output or os.path.join(
+        PROJECT_ROOT, 'output', 'benchmarks', f"render_cache_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Benchmark the records-to-PDF pipeline stage by stage and end to end
+
+    python -m benchmarks.run --customers 50 --records 500 --items 5
+    python -m benchmarks.run --stages render,email --workers 4 --output results.json
+
+Each stage runs in a fresh process so peak RSS is reported per stage.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.config_manager import ConfigManager
+from benchmarks.synthetic import generate_billing_rows, date_range
+
+STAGES = ['validate', 'render', 'persist', 'email', 'end_to_end']
+BACKENDS = ['sqlite', 'memory-mongo']
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its reaped children"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+def summarize(stage: str, count: int, seconds: float, latencies: List[float], **extra) -> Dict[str, Any]:
+    result = {
+        'stage': stage,
+        'invoices': count,
+        'seconds': round(seconds, 4),
+        'invoices_per_sec': round(count / seconds, 2) if seconds else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3) if latencies else None,
+        'peak_rss_mb': peak_rss_mb()
+    }
+    result.update(extra)
+    return result
+
+def write_config(work_dir: str, smtp_port: int = 0, overrides: Optional[Dict[str, Any]] = None) -> str:
+    """Copy config/settings.json with output, logging and email pointed at the sandbox"""
+    with open(os.path.join(PROJECT_ROOT, 'config', 'settings.json')) as f:
+        config = json.load(f)
+    
+    config['company']['logo_path'] = os.path.join(PROJECT_ROOT, config['company']['logo_path'])
+    config['output']['folder'] = os.path.join(work_dir, 'pdf')
+    config['logging'] = {'level': 'WARNING', 'file': os.path.join(work_dir, 'logs', 'benchmark.log')}
+    config['metrics'] = {'enabled': True, 'report_folder': os.path.join(work_dir, 'reports'), 'prometheus_file': None}
+    config['cache'] = dict(config.get('cache', {}), folder=os.path.join(work_dir, 'cache'))
+    config['archive'] = dict(config.get('archive', {}), folder=os.path.join(work_dir, 'archives'))
+    config['email'].update({
+        'enabled': True,
+        'smtp_server': '127.0.0.1',
+        'smtp_port': smtp_port,
+        'use_tls': False,
+        'username': '',
+        'password': ''
+    })
+    for section, values in (overrides or {}).items():
+        config.setdefault(section, {}).update(values)
+    
+    config_path = os.path.join(work_dir, 'settings.json')
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=4)
+    return config_path
+
+def make_db_manager(config_manager: ConfigManager, backend: str, rows):
+    from benchmarks.standins import SQLiteDatabaseManager, InMemoryMongoDatabaseManager
+    if backend == 'memory-mongo':
+        return InMemoryMongoDatabaseManager(config_manager, rows)
+    return SQLiteDatabaseManager(config_manager, rows)
+
+def iter_invoices(params: Dict[str, Any]):
+    from src.data_validator import DataValidator
+    rows = generate_billing_rows(params['customers'], params['records'], params['items'])
+    for invoice, _ in DataValidator().validate_billing_records_iter(rows):
+        if invoice:
+            yield invoice
+
+def bench_validate(params: Dict[str, Any], work_dir: str) -> Dict[str, Any]:
+    from src.data_validator import DataValidator
+    validator = DataValidator()
+    rows = generate_billing_rows(params['customers'], params['records'], params['items'])
+    latencies, errors = [], 0
+    
+    started = time.perf_counter()
+    iterator = validator.validate_billing_records_iter(rows)
+    while True:
+        item_started = time.perf_counter()
+        try:
+            invoice, validation_errors = next(iterator)
+        except StopIteration:
+            break
+        latencies.append(time.perf_counter() - item_started)
+        errors += len(validation_errors)
+    
+    return summarize('validate', len(latencies), time.perf_counter() - started, latencies,
+                     validation_errors=errors)
+
+def bench_render(params: Dict[str, Any], work_dir: str) -> Dict[str, Any]:
+    from src.pdf_generator import PDFGenerator
+    generator = PDFGenerator(ConfigManager(write_config(work_dir, overrides=params.get('overrides'))))
+    invoices = list(iter_invoices(params))
+    latencies, total_bytes = [], 0
+    
+    started = time.perf_counter()
+    for invoice in invoices:
+        item_started = time.perf_counter()
+        pdf_path = generator.generate_invoice(invoice)
+        latencies.append(time.perf_counter() - item_started)
+        total_bytes += os.path.getsize(pdf_path)
+    
+    return summarize('render', len(invoices), time.perf_counter() - started, latencies,
+                     bytes_per_invoice=total_bytes // max(1, len(invoices)))
+
+def bench_persist(params: Dict[str, Any], work_dir: str) -> Dict[str, Any]:
+    config_manager = ConfigManager(write_config(work_dir))
+    db_manager = make_db_manager(config_manager, params['backend'], [])
+    invoices = list(iter_invoices(params))
+    latencies = []
+    
+    db_manager.connect()
+    writer = db_manager.metadata_writer(run_key='benchmark')
+    started = time.perf_counter()
+    for invoice in invoices:
+        item_started = time.perf_counter()
+        writer.add(invoice, f"output/invoice_{invoice.invoice_number}.pdf")
+        latencies.append(time.perf_counter() - item_started)
+    writer.flush()
+    seconds = time.perf_counter() - started
+    db_manager.close()
+    
+    return summarize('persist', len(invoices), seconds, latencies,
+                     backend=params['backend'], flush_size=writer.flush_size)
+
+def bench_email(params: Dict[str, Any], work_dir: str) -> Dict[str, Any]:
+    from benchmarks.standins import LocalSMTPServer
+    from src.email_sender import EmailSender
+    from src.pdf_generator import PDFGenerator
+    
+    invoices = list(iter_invoices(params))
+    with LocalSMTPServer() as smtp_server:
+        config_manager = ConfigManager(write_config(work_dir, smtp_server.port))
+        # One real attachment is reused so only the email path is measured
+        pdf_path = PDFGenerator(config_manager).generate_invoice(invoices[0])
+        sender = EmailSender(config_manager)
+        latencies = []
+        
+        started = time.perf_counter()
+        for invoice in invoices:
+            item_started = time.perf_counter()
+            sender.deliver_invoice(invoice, pdf_path)
+            latencies.append(time.perf_counter() - item_started)
+        seconds = time.perf_counter() - started
+        sender.close()
+        delivered = smtp_server.messages
+    
+    return summarize('email', len(invoices), seconds, latencies, delivered=delivered)
+
+def bench_end_to_end(params: Dict[str, Any], work_dir: str) -> Dict[str, Any]:
+    from benchmarks.standins import LocalSMTPServer
+    from src.invoice_generator import InvoiceGenerator
+    
+    with LocalSMTPServer() as smtp_server:
+        config_path = write_config(work_dir, smtp_server.port)
+        generator = InvoiceGenerator(config_path)
+        rows = generate_billing_rows(params['customers'], params['records'], params['items'])
+        generator.db_manager = make_db_manager(generator.config_manager, params['backend'], rows)
+        start_date, end_date = date_range(params['records'])
+        
+        started = time.perf_counter()
+        successful, errors = generator.generate_invoices(
+            start_date, end_date, send_email=params['send_email'], workers=params['workers'])
+        seconds = time.perf_counter() - started
+        delivered = smtp_server.messages
+    
+    return summarize('end_to_end', len(successful), seconds, [],
+                     errors=len(errors), emails_delivered=delivered,
+                     workers=params['workers'], backend=params['backend'])
+
+STAGE_FUNCTIONS: Dict[str, Callable[[Dict[str, Any], str], Dict[str, Any]]] = {
+    'validate': bench_validate,
+    'render': bench_render,
+    'persist': bench_persist,
+    'email': bench_email,
+    'end_to_end': bench_end_to_end
+}
+
+def run_stage(stage: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Entry point inside the per-stage child process"""
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(PROJECT_ROOT)
+    work_dir = tempfile.mkdtemp(prefix=f"invoice_bench_{stage}_")
+    try:
+        return STAGE_FUNCTIONS[stage](params, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_isolated(stage: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_stage, stage, params).result()
+
+def print_table(results: List[Dict[str, Any]]):
+    header = f"{'stage':<12}{'invoices':>10}{'seconds':>10}{'inv/sec':>10}{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>10}"
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        cells = [result['invoices'], result['seconds'], result['invoices_per_sec'],
+                 result['p50_ms'], result['p99_ms'], result['peak_rss_mb']]
+        print(f"{result['stage']:<12}" + ''.join(f"{'-' if cell is None else cell:>10}" for cell in cells))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=50, help='Number of synthetic customers')
+    parser.add_argument('--records', type=int, default=200, help='Number of billing records (invoices)')
+    parser.add_argument('--items', type=int, default=5, help='Line items per billing record')
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"Comma separated subset of {STAGES}")
+    parser.add_argument('--backend', choices=BACKENDS, default='sqlite', help='Database stand-in')
+    parser.add_argument('--workers', type=int, default=1, help='Render workers for the end_to_end stage')
+    parser.add_argument('--no-email', action='store_true', help='Skip email in the end_to_end stage')
+    parser.add_argument('--output', help='JSON results path (default: output/benchmarks/pipeline_<timestamp>.json)')
+    args = parser.parse_args(argv)
+    
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)}")
+    
+    params = {
+        'customers': args.customers,
+        'records': args.records,
+        'items': args.items,
+        'backend': args.backend,
+        'workers': args.workers,
+        'send_email': not args.no_email
+    }
+    
+    results = []
+    for stage in stages:
+        print(f"Running {stage}...", flush=True)
+        results.append(run_isolated(stage, params))
+    
+    print()
+    print_table(results)
+    
+    report = {
+        'benchmark': 'pipeline',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'params': params,
+        'stages': {result['stage']: result for result in results}
+    }
+    output_path = args.output or os.path.join(
+        PROJECT_ROOT, 'output', 'benchmarks', f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output_path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
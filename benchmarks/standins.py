@@ -0,0 +1,325 @@
+"""
+Offline stand-ins for the services the pipeline talks to
+
+SQLiteDatabaseManager   - runs the MySQL code paths' SQL against SQLite
+InMemoryMongoDatabaseManager - MongoDB code paths against in-memory collections
+LocalSMTPServer         - minimal threaded SMTP sink on localhost
+"""
+
+import socketserver
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.config_manager import ConfigManager
+from src.database import (DatabaseManager, BILLING_RECORDS_QUERY, INSERT_METADATA_QUERY,
+                          GENERATED_INVOICES_QUERY)
+
+SCHEMA = """
+CREATE TABLE customers (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL,
+    address TEXT NOT NULL, phone TEXT
+);
+CREATE TABLE billing_records (
+    id INTEGER PRIMARY KEY, customer_id INTEGER NOT NULL, invoice_number TEXT,
+    billing_date TEXT NOT NULL, issue_date TEXT, due_date TEXT,
+    tax_rate TEXT, discount_rate TEXT, notes TEXT, created_at TEXT
+);
+CREATE TABLE billing_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, billing_record_id INTEGER NOT NULL,
+    description TEXT NOT NULL, quantity INTEGER NOT NULL, unit_price TEXT NOT NULL
+);
+CREATE TABLE invoice_metadata (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, invoice_number TEXT NOT NULL,
+    customer_name TEXT NOT NULL, customer_email TEXT NOT NULL, issue_date TEXT NOT NULL,
+    due_date TEXT NOT NULL, total_amount REAL NOT NULL, pdf_path TEXT NOT NULL, created_at TEXT
+);
+CREATE INDEX idx_invoice_metadata_invoice_number ON invoice_metadata (invoice_number);
+CREATE TABLE invoice_run_checkpoints (
+    run_key TEXT PRIMARY KEY, invoices_done INTEGER NOT NULL DEFAULT 0,
+    last_invoice_number TEXT, status TEXT NOT NULL, updated_at TEXT
+);
+"""
+
+SAVE_CHECKPOINT_SQLITE = """
+INSERT OR REPLACE INTO invoice_run_checkpoints
+(run_key, invoices_done, last_invoice_number, status, updated_at)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+def _sqlite_query(query: str) -> str:
+    return query.replace('%s', '?')
+
+def _sqlite_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def _dict_factory(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """DatabaseManager on an SQLite database, reusing the MySQL queries"""
+    
+    def __init__(self, config_manager: ConfigManager, rows: Iterable[Dict[str, Any]] = (),
+                 path: str = ':memory:'):
+        super().__init__(config_manager)
+        self.db_type = 'mysql'
+        self._sqlite = sqlite3.connect(path, check_same_thread=False)
+        self._sqlite.executescript(SCHEMA)
+        self.load_rows(rows)
+    
+    def load_rows(self, rows: Iterable[Dict[str, Any]]):
+        """Split joined billing rows back into the three source tables"""
+        customers, records = set(), set()
+        for row in rows:
+            if row['customer_id'] not in customers:
+                customers.add(row['customer_id'])
+                self._sqlite.execute(
+                    "INSERT INTO customers (id, name, email, address, phone) VALUES (?, ?, ?, ?, ?)",
+                    (row['customer_id'], row['name'], row['email'], row['address'], row['phone']))
+            if row['id'] not in records:
+                records.add(row['id'])
+                self._sqlite.execute(
+                    "INSERT INTO billing_records (id, customer_id, invoice_number, billing_date, issue_date, "
+                    "due_date, tax_rate, discount_rate, notes, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    tuple(_sqlite_value(row[key]) for key in (
+                        'id', 'customer_id', 'invoice_number', 'billing_date', 'issue_date',
+                        'due_date', 'tax_rate', 'discount_rate', 'notes', 'created_at')))
+            self._sqlite.execute(
+                "INSERT INTO billing_items (billing_record_id, description, quantity, unit_price) "
+                "VALUES (?, ?, ?, ?)",
+                (row['id'], row['description'], row['quantity'], _sqlite_value(row['unit_price'])))
+        self._sqlite.commit()
+    
+    def connect(self):
+        self.connection = self._sqlite
+    
+    def close(self):
+        self.connection = None
+    
+    def ping(self):
+        self._sqlite.execute("SELECT 1")
+    
+    def _get_mysql_records(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        return list(self._iter_mysql_records(start_date, end_date, self.fetch_chunk_size))
+    
+    def _iter_mysql_records(self, start_date: datetime, end_date: datetime,
+                            chunk_size: int) -> Iterator[Dict[str, Any]]:
+        cursor = self._sqlite.cursor()
+        cursor.row_factory = _dict_factory
+        cursor.execute(_sqlite_query(BILLING_RECORDS_QUERY),
+                       (start_date.date().isoformat(), end_date.date().isoformat()))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    
+    def _save_mysql_metadata(self, metadata: Dict[str, Any]):
+        self._sqlite.execute(_sqlite_query(INSERT_METADATA_QUERY),
+                             tuple(_sqlite_value(value) for value in metadata.values()))
+        self._sqlite.commit()
+    
+    def _save_mysql_metadata_many(self, metadata_rows: List[Dict[str, Any]],
+                                  checkpoint: Optional[Dict[str, Any]] = None):
+        self._sqlite.executemany(
+            _sqlite_query(INSERT_METADATA_QUERY),
+            [tuple(_sqlite_value(value) for value in row.values()) for row in metadata_rows])
+        if checkpoint:
+            self._execute_checkpoint(checkpoint)
+        self._sqlite.commit()
+    
+    def get_generated_invoice_numbers(self, invoice_numbers: Iterable[str]) -> Set[str]:
+        numbers = list(dict.fromkeys(invoice_numbers))
+        if not numbers:
+            return set()
+        query = GENERATED_INVOICES_QUERY.format(placeholders=', '.join(['%s'] * len(numbers)))
+        cursor = self._sqlite.execute(_sqlite_query(query), numbers)
+        return {row[0] for row in cursor}
+    
+    def get_run_checkpoint(self, run_key: str) -> Optional[Dict[str, Any]]:
+        cursor = self._sqlite.cursor()
+        cursor.row_factory = _dict_factory
+        cursor.execute("SELECT * FROM invoice_run_checkpoints WHERE run_key = ?", (run_key,))
+        return cursor.fetchone()
+    
+    def save_run_checkpoint(self, checkpoint: Dict[str, Any]):
+        self._execute_checkpoint(checkpoint)
+        self._sqlite.commit()
+    
+    def _execute_checkpoint(self, checkpoint: Dict[str, Any]):
+        self._sqlite.execute(SAVE_CHECKPOINT_SQLITE, tuple(
+            _sqlite_value(value) for value in self._checkpoint_values(checkpoint)))
+
+class InMemoryCollection:
+    """The slice of the pymongo Collection API that DatabaseManager uses"""
+    
+    def __init__(self):
+        self.documents: List[Dict[str, Any]] = []
+    
+    def insert_one(self, document: Dict[str, Any]):
+        self.documents.append(dict(document))
+    
+    def insert_many(self, documents: Iterable[Dict[str, Any]], ordered: bool = True):
+        self.documents.extend(dict(document) for document in documents)
+    
+    def find(self, query: Optional[Dict[str, Any]] = None,
+             projection: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        for document in self.documents:
+            if _matches(document, query or {}):
+                yield _project(document, projection)
+    
+    def find_one(self, query: Optional[Dict[str, Any]] = None,
+                 projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return next(self.find(query, projection), None)
+    
+    def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        for document in self.documents:
+            if _matches(document, query):
+                document.update(update.get('$set', {}))
+                return
+        if upsert:
+            self.documents.append(dict(query, **update.get('$set', {})))
+    
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs) -> '_InMemoryCursor':
+        # Only $match is modelled: billing rows are stored already joined
+        documents = self.documents
+        for stage in pipeline:
+            if '$match' in stage:
+                documents = [document for document in documents if _matches(document, stage['$match'])]
+        return _InMemoryCursor(documents)
+
+class _InMemoryCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self._documents = documents
+    
+    def __iter__(self):
+        return iter(self._documents)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if '$in' in condition and value not in condition['$in']:
+                return False
+            if '$gte' in condition and not (value is not None and _comparable(value) >= _comparable(condition['$gte'])):
+                return False
+            if '$lte' in condition and not (value is not None and _comparable(value) <= _comparable(condition['$lte'])):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+def _comparable(value):
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime.combine(value, datetime.min.time())
+    return value
+
+def _project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return dict(document)
+    included = [field for field, flag in projection.items() if flag and field != '_id']
+    if included:
+        return {field: document.get(field) for field in included}
+    return {field: value for field, value in document.items() if projection.get(field, 1)}
+
+class InMemoryDatabase(dict):
+    def __missing__(self, name: str) -> InMemoryCollection:
+        collection = self[name] = InMemoryCollection()
+        return collection
+
+class InMemoryMongoDatabaseManager(DatabaseManager):
+    """DatabaseManager on in-memory collections, exercising the MongoDB code paths"""
+    
+    def __init__(self, config_manager: ConfigManager, rows: Iterable[Dict[str, Any]] = ()):
+        super().__init__(config_manager)
+        self.db_type = 'mongodb'
+        self._database = InMemoryDatabase()
+        self._database['billing_records'].insert_many(rows)
+    
+    def connect(self):
+        self.connection = self._database
+    
+    def close(self):
+        self.connection = None
+    
+    def ping(self):
+        pass
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self._reply(b"220 localhost ESMTP benchmark stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.strip().upper()
+            
+            if command.startswith(b"EHLO"):
+                self._reply(b"250-localhost\r\n250 8BITMIME")
+            elif command.startswith(b"HELO"):
+                self._reply(b"250 localhost")
+            elif command.startswith(b"DATA"):
+                self._reply(b"354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    size += len(data_line)
+                self.server.record_message(size)
+                self._reply(b"250 OK queued")
+            elif command.startswith(b"QUIT"):
+                self._reply(b"221 Bye")
+                return
+            elif command.split(b" ")[0] in (b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                self._reply(b"250 OK")
+            else:
+                self._reply(b"502 Command not implemented")
+    
+    def _reply(self, message: bytes):
+        self.wfile.write(message + b"\r\n")
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Accepts and discards mail on localhost; counts messages and bytes"""
+    
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        super().__init__((host, port), _SMTPHandler)
+        self.messages = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+    
+    def record_message(self, size: int):
+        with self._lock:
+            self.messages += 1
+            self.bytes_received += size
+    
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        return False
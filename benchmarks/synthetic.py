@@ -0,0 +1,70 @@
+"""
+Synthetic billing data in the shape DatabaseManager returns for MySQL:
+one row per line item, customer columns repeated, ordered by record id.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List
+
+PRODUCTS = [
+    'Portland Cement (50kg bag)', 'TMT Steel Bar 12mm', 'River Sand (per ton)',
+    'Red Clay Bricks (1000 pcs)', 'PVC Pipe 4 inch', 'Ceramic Floor Tiles (box)',
+    'Electrical Wiring 2.5 sq mm', 'Exterior Emulsion Paint 20L', 'Plywood Sheet 18mm',
+    'Consulting Services (hour)', 'Site Inspection Visit', 'Transport Charges'
+]
+
+CITIES = ['Chennai', 'Mumbai', 'Bengaluru', 'Hyderabad', 'Pune', 'Kolkata', 'Delhi']
+
+def generate_customers(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    customers = []
+    for customer_id in range(1, count + 1):
+        city = rng.choice(CITIES)
+        customers.append({
+            'id': customer_id,
+            'name': f"Customer {customer_id} Traders",
+            'email': f"accounts{customer_id}@customer{customer_id}.example.com",
+            'address': f"{rng.randint(1, 999)} Market Road\n{city} {rng.randint(100000, 999999)}",
+            'phone': f"+91 {rng.randint(7000000000, 9999999999)}"
+        })
+    return customers
+
+def generate_billing_rows(customers: int = 100, records: int = 1000, items_per_record: int = 5,
+                          start_date: date = date(2024, 1, 1), seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Yield joined billing_records/customers/billing_items rows ordered by record id"""
+    rng = random.Random(seed)
+    customer_rows = generate_customers(customers, seed)
+    
+    for record_id in range(1, records + 1):
+        customer = customer_rows[(record_id - 1) % len(customer_rows)]
+        billing_date = start_date + timedelta(days=(record_id - 1) % 90)
+        record = {
+            'id': record_id,
+            'customer_id': customer['id'],
+            'invoice_number': f"INV-BENCH-{record_id:07d}",
+            'billing_date': billing_date,
+            'issue_date': billing_date,
+            'due_date': billing_date + timedelta(days=30),
+            'tax_rate': Decimal('0.1800'),
+            'discount_rate': Decimal('0.0500') if record_id % 4 == 0 else Decimal('0.0000'),
+            'notes': 'Payment due within 30 days' if record_id % 3 == 0 else None,
+            'created_at': datetime.combine(billing_date, datetime.min.time()),
+            'name': customer['name'],
+            'email': customer['email'],
+            'address': customer['address'],
+            'phone': customer['phone']
+        }
+        for _ in range(items_per_record):
+            row = dict(record)
+            row['description'] = rng.choice(PRODUCTS)
+            row['quantity'] = rng.randint(1, 50)
+            row['unit_price'] = Decimal(rng.randint(100, 500000)) / Decimal(100)
+            yield row
+
+def date_range(records: int, start_date: date = date(2024, 1, 1)):
+    """Billing date range covering every generated record"""
+    end_date = start_date + timedelta(days=min(records, 90))
+    return (datetime.combine(start_date, datetime.min.time()),
+            datetime.combine(end_date, datetime.min.time()))
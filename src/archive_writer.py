@@ -0,0 +1,173 @@
+import os
+import re
+import csv
+import hashlib
+import tarfile
+import time
+import zipfile
+import logging
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional
+from .config_manager import ConfigManager
+from .models import Invoice
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = ('zip', 'tar')
+
+# "<volume path>#<member>", as returned by ArchiveWriter.add
+_LOCATION = re.compile(r'^(.*?\.(?:zip|tar))#(.+)$')
+
+MANIFEST_FIELDS = ['invoice_number', 'customer_email', 'total_amount', 'volume', 'member', 'size', 'sha256']
+
+class ArchiveWriter:
+    """
+    Streams rendered invoice PDFs into rolling zip or tar volumes
+    Each PDF goes straight from memory into the open volume; a new volume is
+    started once the current one would pass max_volume_bytes. Every entry is
+    also listed in a manifest CSV next to the volumes. Volumes of a resumed
+    run continue the numbering and the manifest is appended to.
+    A volume is written as "<volume>.partial" and only renamed, listed in the
+    manifest and reported to on_volume_closed(volume_path) once it is complete,
+    so a crash never leaves recorded entries in an unreadable volume.
+    """
+    
+    def __init__(self, folder: str, run_key: str, archive_format: str = 'zip',
+                 max_volume_bytes: int = 512 * 1024 * 1024, compress: bool = False,
+                 on_volume_closed: Optional[Callable[[str], None]] = None):
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {archive_format}")
+        self.folder = folder
+        self.run_key = run_key
+        self.archive_format = archive_format
+        self.max_volume_bytes = max(1, int(max_volume_bytes))
+        self.compress = compress
+        self.on_volume_closed = on_volume_closed
+        self.prefix = f"invoices_{run_key}"
+        self.entries = 0
+        self.volume_paths = []
+        self._volume = None
+        self._volume_file = None
+        self._volume_rows: List[Dict[str, Any]] = []
+        self._volume_index = self._last_volume_index()
+        
+        os.makedirs(folder, exist_ok=True)
+        self._remove_partial_volumes()
+        self.manifest_path = os.path.join(folder, f"{self.prefix}_manifest.csv")
+        new_manifest = not os.path.exists(self.manifest_path)
+        self._manifest_file = open(self.manifest_path, 'a', newline='', encoding='utf-8')
+        self._manifest = csv.DictWriter(self._manifest_file, fieldnames=MANIFEST_FIELDS)
+        if new_manifest:
+            self._manifest.writeheader()
+    
+    @classmethod
+    def from_settings(cls, config_manager: ConfigManager, run_key: str,
+                      archive_format: Optional[str] = None,
+                      on_volume_closed: Optional[Callable[[str], None]] = None) -> 'ArchiveWriter':
+        """Build a writer from the archive config section; archive_format overrides archive.format"""
+        settings = config_manager.get('archive', {})
+        return cls(
+            settings.get('folder', 'output/archives'),
+            run_key,
+            archive_format=archive_format or settings.get('format', 'zip'),
+            max_volume_bytes=int(settings.get('max_volume_mb', 512) * 1024 * 1024),
+            compress=settings.get('compress', False),
+            on_volume_closed=on_volume_closed
+        )
+    
+    def add(self, invoice: Invoice, filename: str, pdf_bytes: bytes) -> str:
+        """Append one PDF to the current volume; returns its location as "<volume path>#<member>" """
+        if self._volume is None or self._volume_size() + len(pdf_bytes) > self.max_volume_bytes:
+            self._open_volume()
+        
+        if self.archive_format == 'zip':
+            member = zipfile.ZipInfo(filename, date_time=time.localtime()[:6])
+            member.compress_type = zipfile.ZIP_DEFLATED if self.compress else zipfile.ZIP_STORED
+            self._volume.writestr(member, pdf_bytes)
+        else:
+            member = tarfile.TarInfo(filename)
+            member.size = len(pdf_bytes)
+            member.mtime = int(time.time())
+            self._volume.addfile(member, BytesIO(pdf_bytes))
+        
+        volume_path = self.volume_paths[-1]
+        self._volume_rows.append({
+            'invoice_number': invoice.invoice_number,
+            'customer_email': invoice.customer.email,
+            'total_amount': f"{invoice.total_amount:.2f}",
+            'volume': os.path.basename(volume_path),
+            'member': filename,
+            'size': len(pdf_bytes),
+            'sha256': hashlib.sha256(pdf_bytes).hexdigest()
+        })
+        self.entries += 1
+        return f"{volume_path}#{filename}"
+    
+    def close(self):
+        """Finish the open volume and the manifest (safe to call again)"""
+        if self._manifest_file.closed:
+            return
+        self._close_volume()
+        self._manifest_file.close()
+        logger.info(f"Archived {self.entries} invoices in {len(self.volume_paths)} volumes; "
+                    f"manifest: {self.manifest_path}")
+    
+    @staticmethod
+    def read_member(location: str) -> bytes:
+        """PDF bytes of a "<volume path>#<member>" location in a completed volume"""
+        match = _LOCATION.match(location)
+        if not match:
+            raise KeyError(f"Not an archive location: {location}")
+        volume_path, member = match.groups()
+        if volume_path.endswith('.zip'):
+            with zipfile.ZipFile(volume_path) as volume:
+                return volume.read(member)
+        with tarfile.open(volume_path) as volume:
+            return volume.extractfile(member).read()
+    
+    def _volume_size(self) -> int:
+        # Bytes written so far; the central directory / end blocks add a little on close
+        return self._volume_file.tell()
+    
+    def _open_volume(self):
+        self._close_volume()
+        self._volume_index += 1
+        extension = 'zip' if self.archive_format == 'zip' else 'tar'
+        path = os.path.join(self.folder, f"{self.prefix}_{self._volume_index:03d}.{extension}")
+        self._volume_file = open(path + '.partial', 'wb')
+        if self.archive_format == 'zip':
+            self._volume = zipfile.ZipFile(self._volume_file, 'w')
+        else:
+            self._volume = tarfile.open(fileobj=self._volume_file, mode='w', format=tarfile.PAX_FORMAT)
+        self.volume_paths.append(path)
+        logger.info(f"Writing archive volume {path}")
+    
+    def _close_volume(self):
+        if self._volume is None:
+            return
+        self._volume.close()
+        self._volume_file.close()
+        self._volume = self._volume_file = None
+        
+        volume_path = self.volume_paths[-1]
+        os.replace(volume_path + '.partial', volume_path)
+        self._manifest.writerows(self._volume_rows)
+        self._manifest_file.flush()
+        self._volume_rows = []
+        if self.on_volume_closed:
+            self.on_volume_closed(volume_path)
+    
+    def _remove_partial_volumes(self):
+        """Drop volumes an interrupted run left unfinished; none of their entries were recorded"""
+        pattern = re.compile(rf"^{re.escape(self.prefix)}_\d+\.(zip|tar)\.partial$")
+        for name in filter(pattern.match, os.listdir(self.folder)):
+            logger.warning(f"Removing unfinished archive volume {name}")
+            os.remove(os.path.join(self.folder, name))
+    
+    def _last_volume_index(self) -> int:
+        """Highest volume number already on disk for this run (0 if none)"""
+        if not os.path.isdir(self.folder):
+            return 0
+        pattern = re.compile(rf"^{re.escape(self.prefix)}_(\d+)\.(zip|tar)$")
+        numbers = [int(match.group(1)) for match in map(pattern.match, os.listdir(self.folder)) if match]
+        return max(numbers, default=0)
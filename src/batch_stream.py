@@ -0,0 +1,91 @@
+import json
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Set
+from .config_manager import ConfigManager
+
+logger = logging.getLogger(__name__)
+
+# Renders one invoice payload; returns the per-item result fields (invoice number, download URL, ...)
+BatchRenderFunction = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+def _ndjson(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+
+class NDJSONBatchRenderer:
+    """
+    Renders a stream of NDJSON invoice payloads on a thread pool
+    Lines are read only while fewer than max_in_flight renders are pending, and
+    each result line is yielded as soon as its render finishes (completion
+    order, tagged with the input line number). Neither the request nor the
+    response is ever held in memory as a whole.
+    """
+    
+    def __init__(self, render: BatchRenderFunction, workers: int = 2, max_in_flight: int = 8):
+        self.render = render
+        self.workers = max(1, int(workers))
+        self.max_in_flight = max(self.workers, int(max_in_flight))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='batch-render')
+    
+    @classmethod
+    def from_settings(cls, config_manager: ConfigManager, render: BatchRenderFunction) -> 'NDJSONBatchRenderer':
+        """Build a renderer from the web.batch config section"""
+        settings = config_manager.get('web.batch', {})
+        return cls(
+            render,
+            workers=settings.get('workers', 2),
+            max_in_flight=settings.get('max_in_flight', 8)
+        )
+    
+    def stream(self, lines: Iterable[bytes]) -> Iterator[bytes]:
+        """NDJSON result lines for NDJSON payload lines, ending with a summary line"""
+        pending: Set[Future] = set()
+        succeeded = failed = 0
+        
+        def finished(done: Set[Future]) -> Iterator[bytes]:
+            nonlocal succeeded, failed
+            for future in done:
+                pending.discard(future)
+                record = future.result()
+                if record['status'] == 'done':
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield _ndjson(record)
+        
+        line_number = 0
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            if len(pending) >= self.max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            else:
+                # Send whatever finished while the line was being read
+                done = {future for future in pending if future.done()}
+            yield from finished(done)
+            pending.add(self._executor.submit(self._render_line, line_number, line))
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from finished(done)
+        
+        logger.info(f"Batch stream finished: {succeeded} rendered, {failed} failed")
+        yield _ndjson({'summary': True, 'total': succeeded + failed, 'succeeded': succeeded, 'failed': failed})
+    
+    def _render_line(self, line_number: int, line: bytes) -> Dict[str, Any]:
+        record: Dict[str, Any] = {'line': line_number}
+        try:
+            payload = json.loads(line)
+            if not isinstance(payload, dict):
+                raise ValueError('Expected a JSON invoice object')
+            record['invoice_number'] = payload.get('invoice_number')
+            record.update(self.render(payload))
+            record['status'] = 'done'
+        except Exception as e:
+            logger.warning(f"Batch line {line_number} failed: {e}")
+            record.update(status='failed', error=str(e))
+        return record
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
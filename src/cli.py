@@ -17,8 +17,12 @@ def cli():
               help='End date (YYYY-MM-DD)')
 @click.option('--days', type=int, help='Generate invoices for last N days')
 @click.option('--send-email', is_flag=True, help='Send invoices via email')
+@click.option('--workers', type=int, help='Worker processes for PDF rendering (default: processing.workers)')
+@click.option('--resume', is_flag=True, help='Skip invoices already recorded and checkpoint the run')
+@click.option('--archive', type=click.Choice(['zip', 'tar']),
+              help='Stream PDFs into rolling zip/tar volumes with a manifest instead of loose files')
 @click.option('--config', default='config/settings.json', help='Configuration file path')
-def generate(start_date, end_date, days, send_email, config):
+def generate(start_date, end_date, days, send_email, workers, resume, archive, config):
     """Generate invoices for a date range"""
     
     # Determine date range
@@ -33,20 +37,63 @@ def generate(start_date, end_date, days, send_email, config):
     
     try:
         generator = InvoiceGenerator(config)
-        successful, errors = generator.generate_invoices(start_date, end_date, send_email)
+        successful, errors = generator.generate_invoices(start_date, end_date, send_email,
+                                                          workers=workers, resume=resume, archive=archive)
         
         click.echo(f"\nSuccessfully generated {len(successful)} invoices")
         for pdf_path in successful:
             click.echo(f"   {pdf_path}")
         
+        if generator.skipped_count:
+            click.echo(f"\nSkipped {generator.skipped_count} invoices already generated")
+        
         if errors:
             click.echo(f"\n{len(errors)} errors occurred:")
             for error in errors:
                 click.echo(f"   - {error}")
         
         if send_email:
-            click.echo(f"\nEmail sending {'enabled' if send_email else 'disabled'}")
-            
+            report = generator.email_report
+            click.echo(f"\nEmails sent: {report['sent_count']}, failed: {report['failed_count']}")
+            for failure in report['failed']:
+                click.echo(f"   - {failure}")
+    
+    except Exception as e:
+        click.echo(f"Error: {e}")
+
+@cli.command()
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), 
+              help='Start date (YYYY-MM-DD)')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), 
+              help='End date (YYYY-MM-DD)')
+@click.option('--days', type=int, help='Include invoices for last N days')
+@click.option('--output', help='Combined PDF path (default: output/print_runs/print_run_<range>.pdf)')
+@click.option('--config', default='config/settings.json', help='Configuration file path')
+def print_run(start_date, end_date, days, output, config):
+    """Render all invoices for a date range into one bookmarked PDF for printing"""
+    
+    # Determine date range
+    if days:
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+    elif not start_date or not end_date:
+        click.echo("Please specify either --start-date and --end-date, or --days")
+        return
+    
+    click.echo(f"Building print run from {start_date.date()} to {end_date.date()}")
+    
+    try:
+        generator = InvoiceGenerator(config)
+        output_path, count, errors = generator.generate_print_run(start_date, end_date, output)
+        
+        if output_path:
+            click.echo(f"\nPrint run with {count} invoices written to {output_path}")
+        
+        if errors:
+            click.echo(f"\n{len(errors)} errors occurred:")
+            for error in errors:
+                click.echo(f"   - {error}")
+    
     except Exception as e:
         click.echo(f"Error: {e}")
 
@@ -64,7 +111,7 @@ def validate(config):
             click.echo("Configuration issues found:")
             for issue in issues:
                 click.echo(f"   - {issue}")
-                
+    
     except Exception as e:
         click.echo(f"Error: {e}")
 
@@ -79,7 +126,7 @@ def test_email(config):
             click.echo("Email connection successful")
         else:
             click.echo("Email connection failed")
-            
+    
     except Exception as e:
         click.echo(f"Error: {e}")
 
@@ -125,7 +172,7 @@ def create_sample(invoice_number, customer_name, customer_email, customer_addres
         
         if send_email:
             click.echo("Email sent successfully")
-            
+    
     except Exception as e:
         click.echo(f"Error: {e}")
 
@@ -180,7 +227,17 @@ def setup():
         due_date DATE NOT NULL,
         total_amount DECIMAL(10,2) NOT NULL,
         pdf_path VARCHAR(500) NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_invoice_metadata_invoice_number (invoice_number)
+    );
+    
+    -- Create invoice_run_checkpoints table (progress of batch runs, used by --resume)
+    CREATE TABLE IF NOT EXISTS invoice_run_checkpoints (
+        run_key VARCHAR(64) PRIMARY KEY,
+        invoices_done INT NOT NULL DEFAULT 0,
+        last_invoice_number VARCHAR(100),
+        status VARCHAR(20) NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
     """
     
@@ -189,5 +246,30 @@ def setup():
     click.echo(mysql_setup)
     click.echo("=" * 60)
 
+@cli.command()
+def migrate():
+    """Upgrade database tables created by an earlier setup (MySQL only)"""
+    click.echo("Migrating database tables...")
+    
+    mysql_migration = """
+    -- Index used by --resume to find invoices already generated
+    -- (skip this statement if SHOW INDEX FROM invoice_metadata already lists it)
+    CREATE INDEX idx_invoice_metadata_invoice_number ON invoice_metadata (invoice_number);
+    
+    -- Create invoice_run_checkpoints table (progress of batch runs, used by --resume)
+    CREATE TABLE IF NOT EXISTS invoice_run_checkpoints (
+        run_key VARCHAR(64) PRIMARY KEY,
+        invoices_done INT NOT NULL DEFAULT 0,
+        last_invoice_number VARCHAR(100),
+        status VARCHAR(20) NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """
+    
+    click.echo("Execute the following SQL commands in your MySQL database:")
+    click.echo("=" * 60)
+    click.echo(mysql_migration)
+    click.echo("=" * 60)
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
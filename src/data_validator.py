@@ -1,5 +1,6 @@
-from typing import List, Dict, Any, Tuple
-from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from datetime import date, datetime
+from itertools import groupby
 from decimal import Decimal, InvalidOperation
 import logging
 from .models import Invoice, Customer, InvoiceItem
@@ -19,21 +20,37 @@ class DataValidator:
         grouped_records = self._group_records(records)
         
         for record_id, record_data in grouped_records.items():
-            try:
-                invoice = self._validate_single_record(record_data)
-                if invoice:
-                    validated_invoices.append(invoice)
-            except Exception as e:
-                error_msg = f"Record {record_id}: {str(e)}"
-                all_errors.append(error_msg)
-                logger.error(error_msg)
+            invoice, errors = self._validate_group(record_id, record_data)
+            if invoice:
+                validated_invoices.append(invoice)
+            all_errors.extend(errors)
         
         return validated_invoices, all_errors
     
+    def validate_billing_records_iter(self, records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Optional[Invoice], List[str]]]:
+        """
+        Validate rows ordered by billing record ID, yielding (invoice, errors) per record
+        A record is complete as soon as the ID changes, so only one group is held in memory.
+        """
+        for record_id, group in groupby(records, key=self._record_id):
+            yield self._validate_group(record_id, list(group))
+    
+    def _validate_group(self, record_id, record_data: List[Dict[str, Any]]) -> Tuple[Optional[Invoice], List[str]]:
+        try:
+            return self._validate_single_record(record_data), []
+        except Exception as e:
+            error_msg = f"Record {record_id}: {str(e)}"
+            logger.error(error_msg)
+            return None, [error_msg]
+    
+    @staticmethod
+    def _record_id(record: Dict[str, Any]):
+        return record.get('id') or record.get('_id')
+    
     def _group_records(self, records: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         grouped = {}
         for record in records:
-            record_id = record.get('id') or record.get('_id')
+            record_id = self._record_id(record)
             if record_id not in grouped:
                 grouped[record_id] = []
             grouped[record_id].append(record)
@@ -56,7 +73,7 @@ class DataValidator:
         issue_date, due_date = self._validate_dates(main_record)
         
         # Create invoice
-        invoice_number = self._validate_invoice_number(main_record)
+        invoice_number = self._validate_invoice_number(main_record, issue_date)
         
         # Get tax and discount rates
         tax_rate = self._validate_decimal(main_record.get('tax_rate', 0.08), 'tax_rate')
@@ -147,6 +164,10 @@ class DataValidator:
         if isinstance(date_value, datetime):
             return date_value
         
+        if isinstance(date_value, date):
+            # MySQL DATE columns come back as datetime.date
+            return datetime.combine(date_value, datetime.min.time())
+        
         if isinstance(date_value, str):
             # Try common date formats
             formats = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y', '%d/%m/%Y']
@@ -158,13 +179,13 @@ class DataValidator:
         
         return None
     
-    def _validate_invoice_number(self, record: Dict[str, Any]) -> str:
-        invoice_number = record.get('invoice_number', '').strip()
+    def _validate_invoice_number(self, record: Dict[str, Any], issue_date: datetime) -> str:
+        invoice_number = (record.get('invoice_number') or '').strip()
         if not invoice_number:
-            # Generate invoice number from record ID and timestamp
+            # Generate invoice number from record ID and issue date so that
+            # reruns produce the same number and can be skipped on resume
             record_id = record.get('id') or record.get('_id', 'UNK')
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            invoice_number = f"INV-{record_id}-{timestamp}"
+            invoice_number = f"INV-{record_id}-{issue_date.strftime('%Y%m%d')}"
         
         return invoice_number
     
@@ -1,21 +1,85 @@
 import mysql.connector
+import mysql.connector.pooling
 import pymongo
-from typing import List, Dict, Any, Optional
+import pymongo.errors
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Set
 from datetime import datetime
 from decimal import Decimal
 import logging
+import threading
+import time
 from .models import Invoice, Customer, InvoiceItem
 from .config_manager import ConfigManager
 
 logger = logging.getLogger(__name__)
 
+BILLING_RECORDS_QUERY = """
+SELECT b.*, c.name, c.email, c.address, c.phone,
+       bi.description, bi.quantity, bi.unit_price
+FROM billing_records b
+JOIN customers c ON b.customer_id = c.id
+JOIN billing_items bi ON b.id = bi.billing_record_id
+WHERE b.billing_date BETWEEN %s AND %s
+ORDER BY b.id, bi.id
+"""
+
+INSERT_METADATA_QUERY = """
+INSERT INTO invoice_metadata 
+(invoice_number, customer_name, customer_email, issue_date, due_date, 
+ total_amount, pdf_path, created_at)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# {placeholders}: one %s per invoice number looked up
+GENERATED_INVOICES_QUERY = """
+SELECT invoice_number FROM invoice_metadata
+WHERE invoice_number IN ({placeholders})
+"""
+
+CREATE_CHECKPOINTS_TABLE = """
+CREATE TABLE IF NOT EXISTS invoice_run_checkpoints (
+    run_key VARCHAR(64) PRIMARY KEY,
+    invoices_done INT NOT NULL DEFAULT 0,
+    last_invoice_number VARCHAR(100),
+    status VARCHAR(20) NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+SAVE_CHECKPOINT_QUERY = """
+INSERT INTO invoice_run_checkpoints (run_key, invoices_done, last_invoice_number, status, updated_at)
+VALUES (%s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE invoices_done = VALUES(invoices_done),
+    last_invoice_number = VALUES(last_invoice_number),
+    status = VALUES(status), updated_at = VALUES(updated_at)
+"""
+
+class MetadataFlushError(RuntimeError):
+    """invoice_metadata rows that could not be written; rows are the unsaved ones"""
+    
+    def __init__(self, message: str, rows: List[Dict[str, Any]]):
+        super().__init__(message)
+        self.rows = rows
+    
+    @property
+    def invoice_numbers(self) -> List[str]:
+        return [row['invoice_number'] for row in self.rows]
+
 class DatabaseManager:
+    # Process-wide MySQL pools and MongoClients, shared by every DatabaseManager
+    # with the same connection settings (database.pool in settings.json)
+    _mysql_pools: Dict[tuple, mysql.connector.pooling.MySQLConnectionPool] = {}
+    _mongo_clients: Dict[tuple, pymongo.MongoClient] = {}
+    _pool_lock = threading.Lock()
+    
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
         self.db_config = config_manager.get_database_config()
         self.db_type = self.db_config.get('type', 'mysql')
         self.connection = None
-        
+        self.fetch_chunk_size = self.db_config.get('fetch_chunk_size', 1000)
+        self.pool_config = self.db_config.get('pool', {})
+    
     def connect(self):
         if self.db_type == 'mysql':
             self._connect_mysql()
@@ -25,61 +89,151 @@ class DatabaseManager:
             raise ValueError(f"Unsupported database type: {self.db_type}")
     
     def _connect_mysql(self):
-        mysql_config = self.db_config['mysql']
         try:
-            self.connection = mysql.connector.connect(
-                host=mysql_config['host'],
-                port=mysql_config['port'],
-                database=mysql_config['database'],
-                user=mysql_config['username'],
-                password=mysql_config['password']
-            )
+            self.connection = self._open_mysql_connection()
             logger.info("Connected to MySQL database")
         except mysql.connector.Error as e:
             logger.error(f"MySQL connection error: {e}")
             raise
     
+    def _open_mysql_connection(self):
+        """Borrow a connection from the shared pool; close() hands it back"""
+        pool = self._get_mysql_pool()
+        deadline = time.monotonic() + self.pool_config.get('timeout', 10)
+        
+        while True:
+            try:
+                return pool.get_connection()
+            except mysql.connector.errors.PoolError:
+                # Pool exhausted: wait for another caller to return a connection
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+    
+    def _get_mysql_pool(self) -> mysql.connector.pooling.MySQLConnectionPool:
+        mysql_config = self.db_config['mysql']
+        key = (mysql_config['host'], mysql_config['port'],
+               mysql_config['database'], mysql_config['username'])
+        
+        with self._pool_lock:
+            pool = self._mysql_pools.get(key)
+            if pool is None:
+                pool = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name=f"invoice_pool_{len(self._mysql_pools)}",
+                    pool_size=self.pool_config.get('size', 5),
+                    host=mysql_config['host'],
+                    port=mysql_config['port'],
+                    database=mysql_config['database'],
+                    user=mysql_config['username'],
+                    password=mysql_config['password'],
+                    connection_timeout=self.pool_config.get('connect_timeout', 10)
+                )
+                self._mysql_pools[key] = pool
+                logger.info(f"Created MySQL connection pool of size {pool.pool_size}")
+            return pool
+    
     def _connect_mongodb(self):
         mongo_config = self.db_config['mongodb']
         try:
-            client = pymongo.MongoClient(
-                host=mongo_config['host'],
-                port=mongo_config['port']
-            )
+            client = self._get_mongo_client()
             self.connection = client[mongo_config['database']]
             logger.info("Connected to MongoDB database")
         except pymongo.errors.ConnectionFailure as e:
             logger.error(f"MongoDB connection error: {e}")
             raise
     
+    def _get_mongo_client(self) -> pymongo.MongoClient:
+        mongo_config = self.db_config['mongodb']
+        key = (mongo_config['host'], mongo_config['port'])
+        
+        with self._pool_lock:
+            client = self._mongo_clients.get(key)
+            if client is None:
+                client = pymongo.MongoClient(
+                    host=mongo_config['host'],
+                    port=mongo_config['port'],
+                    maxPoolSize=self.pool_config.get('size', 5),
+                    connectTimeoutMS=int(self.pool_config.get('connect_timeout', 10) * 1000),
+                    serverSelectionTimeoutMS=int(self.pool_config.get('connect_timeout', 10) * 1000),
+                    waitQueueTimeoutMS=int(self.pool_config.get('timeout', 10) * 1000)
+                )
+                self._mongo_clients[key] = client
+            return client
+    
+    def ping(self):
+        """Round-trip to the server to prove the connection works"""
+        if self.db_type == 'mysql':
+            self.connection.ping(reconnect=False)
+        else:
+            self.connection.client.admin.command('ping')
+    
     def get_billing_records(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         if self.db_type == 'mysql':
             return self._get_mysql_records(start_date, end_date)
         else:
             return self._get_mongodb_records(start_date, end_date)
     
+    def iter_billing_records(self, start_date: datetime, end_date: datetime,
+                             chunk_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream billing records row by row without materialising the result set
+        Rows are pulled from the server chunk_size at a time (database.fetch_chunk_size).
+        """
+        chunk_size = chunk_size or self.fetch_chunk_size
+        if self.db_type == 'mysql':
+            return self._iter_mysql_records(start_date, end_date, chunk_size)
+        else:
+            return self._iter_mongodb_records(start_date, end_date, chunk_size)
+    
     def _get_mysql_records(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         cursor = self.connection.cursor(dictionary=True)
-        query = """
-        SELECT b.*, c.name, c.email, c.address, c.phone,
-               bi.description, bi.quantity, bi.unit_price
-        FROM billing_records b
-        JOIN customers c ON b.customer_id = c.id
-        JOIN billing_items bi ON b.id = bi.billing_record_id
-        WHERE b.billing_date BETWEEN %s AND %s
-        ORDER BY b.id, bi.id
-        """
-        cursor.execute(query, (start_date, end_date))
+        cursor.execute(BILLING_RECORDS_QUERY, (start_date, end_date))
         return cursor.fetchall()
     
+    def _iter_mysql_records(self, start_date: datetime, end_date: datetime,
+                            chunk_size: int) -> Iterator[Dict[str, Any]]:
+        # An unbuffered cursor blocks its connection until fully read, so the
+        # stream borrows a second pooled connection and metadata writes can
+        # carry on (batch runs therefore need database.pool.size >= 2).
+        connection = self._open_mysql_connection()
+        try:
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            cursor.execute(BILLING_RECORDS_QUERY, (start_date, end_date))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+            cursor.close()
+        finally:
+            # Drain an abandoned stream so the connection goes back to the pool clean
+            if connection.unread_result:
+                connection.consume_results()
+            connection.close()
+    
     def _get_mongodb_records(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         collection = self.connection['billing_records']
-        pipeline = [
+        return list(collection.aggregate(self._mongodb_records_pipeline(start_date, end_date)))
+    
+    def _iter_mongodb_records(self, start_date: datetime, end_date: datetime,
+                              chunk_size: int) -> Iterator[Dict[str, Any]]:
+        collection = self.connection['billing_records']
+        cursor = collection.aggregate(
+            self._mongodb_records_pipeline(start_date, end_date),
+            batchSize=chunk_size,
+            allowDiskUse=True
+        )
+        with cursor:
+            yield from cursor
+    
+    def _mongodb_records_pipeline(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        return [
             {
                 "$match": {
                     "billing_date": {"$gte": start_date, "$lte": end_date}
                 }
             },
+            {"$sort": {"_id": 1}},
             {
                 "$lookup": {
                     "from": "customers",
@@ -98,10 +252,108 @@ class DatabaseManager:
                 }
             }
         ]
-        return list(collection.aggregate(pipeline))
     
     def save_invoice_metadata(self, invoice: Invoice, pdf_path: str):
-        metadata = {
+        metadata = self._build_metadata(invoice, pdf_path)
+        
+        if self.db_type == 'mysql':
+            self._save_mysql_metadata(metadata)
+        else:
+            self._save_mongodb_metadata(metadata)
+    
+    def save_invoice_metadata_many(self, metadata_rows: List[Dict[str, Any]],
+                                   checkpoint: Optional[Dict[str, Any]] = None):
+        """
+        Persist several metadata rows in one round-trip and one commit
+        An optional run checkpoint is written alongside (same transaction on MySQL).
+        """
+        if not metadata_rows:
+            return
+        
+        if self.db_type == 'mysql':
+            self._save_mysql_metadata_many(metadata_rows, checkpoint)
+        else:
+            self._save_mongodb_metadata_many(metadata_rows)
+            if checkpoint:
+                self._save_mongodb_checkpoint(checkpoint)
+    
+    def get_generated_invoice_numbers(self, invoice_numbers: Iterable[str]) -> Set[str]:
+        """Which of the given invoice numbers are already recorded in invoice_metadata (one indexed query)"""
+        numbers = list(dict.fromkeys(invoice_numbers))
+        if not numbers:
+            return set()
+        
+        if self.db_type == 'mysql':
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(GENERATED_INVOICES_QUERY.format(placeholders=', '.join(['%s'] * len(numbers))),
+                               numbers)
+                return {row[0] for row in cursor}
+            finally:
+                cursor.close()
+        else:
+            collection = self.connection['invoice_metadata']
+            documents = collection.find(
+                {"invoice_number": {"$in": numbers}},
+                {"invoice_number": 1, "_id": 0}
+            )
+            return {document['invoice_number'] for document in documents}
+    
+    def ensure_checkpoint_table(self):
+        """
+        Create invoice_run_checkpoints if it does not exist yet (MySQL only)
+        Called before a checkpointed run starts, so a database set up before
+        checkpoints existed fails here rather than in the middle of a batch.
+        """
+        if self.db_type != 'mysql':
+            return
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(CREATE_CHECKPOINTS_TABLE)
+            self.connection.commit()
+        except Exception as e:
+            raise RuntimeError(f"Table invoice_run_checkpoints is missing and could not be created ({e}); "
+                               f"run 'python main.py migrate' and apply the printed SQL") from e
+        finally:
+            cursor.close()
+    
+    def get_run_checkpoint(self, run_key: str) -> Optional[Dict[str, Any]]:
+        if self.db_type == 'mysql':
+            cursor = self.connection.cursor(dictionary=True)
+            try:
+                cursor.execute("SELECT * FROM invoice_run_checkpoints WHERE run_key = %s", (run_key,))
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+        else:
+            return self.connection['invoice_run_checkpoints'].find_one({"run_key": run_key}, {"_id": 0})
+    
+    def save_run_checkpoint(self, checkpoint: Dict[str, Any]):
+        if self.db_type == 'mysql':
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(SAVE_CHECKPOINT_QUERY, self._checkpoint_values(checkpoint))
+                self.connection.commit()
+            finally:
+                cursor.close()
+        else:
+            self._save_mongodb_checkpoint(checkpoint)
+    
+    def metadata_writer(self, flush_size: Optional[int] = None,
+                        flush_interval: Optional[float] = None,
+                        run_key: Optional[str] = None, invoices_done: int = 0) -> 'MetadataWriter':
+        """
+        Create a buffered writer for batch runs (database.metadata_flush_size / _interval)
+        With a run_key every flush also records a checkpoint for that run.
+        """
+        if flush_size is None:
+            flush_size = self.db_config.get('metadata_flush_size', 500)
+        if flush_interval is None:
+            flush_interval = self.db_config.get('metadata_flush_interval', 5.0)
+        return MetadataWriter(self, flush_size, flush_interval, run_key, invoices_done)
+    
+    def _build_metadata(self, invoice: Invoice, pdf_path: str) -> Dict[str, Any]:
+        return {
             'invoice_number': invoice.invoice_number,
             'customer_name': invoice.customer.name,
             'customer_email': invoice.customer.email,
@@ -111,29 +363,182 @@ class DatabaseManager:
             'pdf_path': pdf_path,
             'created_at': datetime.now()
         }
-        
-        if self.db_type == 'mysql':
-            self._save_mysql_metadata(metadata)
-        else:
-            self._save_mongodb_metadata(metadata)
     
     def _save_mysql_metadata(self, metadata: Dict[str, Any]):
         cursor = self.connection.cursor()
-        query = """
-        INSERT INTO invoice_metadata 
-        (invoice_number, customer_name, customer_email, issue_date, due_date, 
-         total_amount, pdf_path, created_at)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(query, tuple(metadata.values()))
+        cursor.execute(INSERT_METADATA_QUERY, tuple(metadata.values()))
         self.connection.commit()
     
+    def _save_mysql_metadata_many(self, metadata_rows: List[Dict[str, Any]],
+                                  checkpoint: Optional[Dict[str, Any]] = None):
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(INSERT_METADATA_QUERY, [tuple(row.values()) for row in metadata_rows])
+            if checkpoint:
+                cursor.execute(SAVE_CHECKPOINT_QUERY, self._checkpoint_values(checkpoint))
+            self.connection.commit()
+        except mysql.connector.Error:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+    
     def _save_mongodb_metadata(self, metadata: Dict[str, Any]):
         collection = self.connection['invoice_metadata']
         collection.insert_one(metadata)
     
+    def _save_mongodb_metadata_many(self, metadata_rows: List[Dict[str, Any]]):
+        collection = self.connection['invoice_metadata']
+        try:
+            collection.insert_many(metadata_rows, ordered=False)
+        except pymongo.errors.BulkWriteError as e:
+            # Unordered: every row without a write error was inserted. A duplicate
+            # _id means an earlier, failed attempt already inserted that row.
+            failed = sorted({error['index'] for error in e.details.get('writeErrors', [])
+                             if error.get('code') != 11000})
+            if failed:
+                raise MetadataFlushError(f"{len(failed)} of {len(metadata_rows)} rows not inserted: {e}",
+                                         [metadata_rows[i] for i in failed]) from e
+    
+    def _save_mongodb_checkpoint(self, checkpoint: Dict[str, Any]):
+        collection = self.connection['invoice_run_checkpoints']
+        collection.update_one(
+            {"run_key": checkpoint['run_key']},
+            {"$set": dict(checkpoint, updated_at=datetime.now())},
+            upsert=True
+        )
+    
+    @staticmethod
+    def _checkpoint_values(checkpoint: Dict[str, Any]) -> tuple:
+        return (checkpoint['run_key'], checkpoint['invoices_done'],
+                checkpoint.get('last_invoice_number'), checkpoint['status'], datetime.now())
+    
     def close(self):
+        """Return the connection to the shared pool"""
         if self.connection:
             if self.db_type == 'mysql':
                 self.connection.close()
-            logger.info("Database connection closed")
\ No newline at end of file
+            self.connection = None
+            logger.info("Database connection closed")
+    
+    @classmethod
+    def close_pools(cls):
+        """
+        Release the shared pools, e.g. on application shutdown
+        MySQL pools have no public close: dropping them lets their idle
+        connections be closed with them, and connections still borrowed go
+        back to the released pool. MongoClients are closed.
+        """
+        with cls._pool_lock:
+            for client in cls._mongo_clients.values():
+                client.close()
+            cls._mysql_pools.clear()
+            cls._mongo_clients.clear()
+
+
+class MetadataWriter:
+    """
+    Buffers invoice_metadata rows and writes them with executemany / insert_many
+    A flush happens every flush_size rows, when flush_interval seconds have passed
+    since the last one, or when flush() is called explicitly at the end of a run.
+    Rows of a failed flush stay buffered: automatic flushes retry them after
+    flush_interval, an explicit flush() raises MetadataFlushError listing them.
+    on_flushed(rows), when set, is called with every batch of rows saved.
+    Rows added with hold() are kept back until release(), for invoices whose
+    output is not complete yet (an archive volume still being written).
+    """
+    
+    def __init__(self, db_manager: DatabaseManager, flush_size: int = 500, flush_interval: float = 5.0,
+                 run_key: Optional[str] = None, invoices_done: int = 0):
+        self.db_manager = db_manager
+        self.flush_size = max(1, int(flush_size))
+        self.flush_interval = float(flush_interval)
+        self.run_key = run_key
+        self.invoices_done = invoices_done
+        self.last_invoice_number = None
+        self.written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._held: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._failing = False
+        self.on_flushed: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    
+    def add(self, invoice: Invoice, pdf_path: str):
+        self._buffer.append(self.db_manager._build_metadata(invoice, pdf_path))
+        self._flush_if_due()
+    
+    def hold(self, invoice: Invoice, pdf_path: str):
+        self._held.append(self.db_manager._build_metadata(invoice, pdf_path))
+    
+    def release(self):
+        """Queue all held rows for writing"""
+        rows, self._held = self._held, []
+        self._buffer.extend(rows)
+        self._flush_if_due()
+    
+    def discard_held(self) -> List[Dict[str, Any]]:
+        """Drop and return the held rows, whose output was never completed"""
+        rows, self._held = self._held, []
+        return rows
+    
+    def _flush_if_due(self):
+        interval_passed = time.monotonic() - self._last_flush >= self.flush_interval
+        # After a failure only the interval triggers a retry, not every added row
+        if interval_passed or (len(self._buffer) >= self.flush_size and not self._failing):
+            try:
+                self.flush()
+            except MetadataFlushError as e:
+                logger.warning(f"{e}; retrying in {self.flush_interval:g}s")
+    
+    def flush(self) -> int:
+        """Write all buffered rows; returns the number written, raises MetadataFlushError on failure"""
+        rows, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        
+        if not rows:
+            return 0
+        
+        checkpoint = None
+        if self.run_key:
+            # Every flushed batch moves the run checkpoint forward
+            checkpoint = {
+                'run_key': self.run_key,
+                'invoices_done': self.invoices_done + len(rows),
+                'last_invoice_number': rows[-1]['invoice_number'],
+                'status': 'running'
+            }
+        
+        try:
+            self.db_manager.save_invoice_metadata_many(rows, checkpoint)
+        except Exception as e:
+            unsaved = e.rows if isinstance(e, MetadataFlushError) else rows
+            unsaved_ids = {id(row) for row in unsaved}
+            self._record_written([row for row in rows if id(row) not in unsaved_ids])
+            # Keep the unsaved rows, ahead of anything added since, for the next attempt
+            self._buffer = unsaved + self._buffer
+            self._failing = True
+            invoice_numbers = ', '.join(row['invoice_number'] for row in unsaved)
+            raise MetadataFlushError(f"Failed to save metadata for {len(unsaved)} invoices "
+                                     f"({invoice_numbers}): {e}", unsaved) from e
+        
+        self._failing = False
+        self._record_written(rows)
+        logger.debug(f"Flushed {len(rows)} invoice metadata rows")
+        return len(rows)
+    
+    def _record_written(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        self.written += len(rows)
+        self.invoices_done += len(rows)
+        self.last_invoice_number = rows[-1]['invoice_number']
+        if self.on_flushed:
+            self.on_flushed(rows)
+    
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+    
+    @property
+    def held(self) -> int:
+        return len(self._held)
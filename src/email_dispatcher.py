@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional
+from .email_sender import EmailSender
+from .metrics import BatchMetrics
+from .models import Invoice
+
+logger = logging.getLogger(__name__)
+
+# Queue marker telling a worker thread to exit
+_STOP = object()
+
+def build_email_report(sent: List[str], failed: List[str]) -> Dict[str, Any]:
+    return {
+        'sent': list(sent),
+        'failed': list(failed),
+        'sent_count': len(sent),
+        'failed_count': len(failed)
+    }
+
+class EmailDispatcher:
+    """
+    Sends invoice emails from a bounded queue on background threads
+    PDF generation only blocks when the queue is full. Failed sends are retried
+    with exponential backoff and the outcomes are collected for the batch report.
+    """
+    
+    def __init__(self, email_sender: EmailSender, concurrency: int = 2, queue_size: int = 100,
+                 max_retries: int = 3, retry_backoff: float = 2.0,
+                 metrics: Optional[BatchMetrics] = None):
+        self.email_sender = email_sender
+        self.metrics = metrics or BatchMetrics()
+        self.concurrency = max(1, int(concurrency))
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff = float(retry_backoff)
+        self.sent: List[str] = []
+        self.failed: List[str] = []
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+    
+    @classmethod
+    def from_settings(cls, email_sender: EmailSender,
+                      metrics: Optional[BatchMetrics] = None) -> 'EmailDispatcher':
+        """Build a dispatcher from the email.dispatcher config section"""
+        settings = email_sender.email_settings.get('dispatcher', {})
+        return cls(
+            email_sender,
+            concurrency=settings.get('concurrency', email_sender.pool_size),
+            queue_size=settings.get('queue_size', 100),
+            max_retries=settings.get('max_retries', 3),
+            retry_backoff=settings.get('retry_backoff', 2.0),
+            metrics=metrics
+        )
+    
+    def submit(self, invoice: Invoice, pdf_path: Optional[str], pdf_bytes: Optional[bytes] = None):
+        """Queue an invoice email (attachment from pdf_path or pdf_bytes); blocks while the queue is full"""
+        if not self._threads:
+            self._start()
+        self._queue.put((invoice, pdf_path, pdf_bytes))
+    
+    def close(self) -> Dict[str, Any]:
+        """Wait for queued emails to finish and return the outcome report"""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        return self.report()
+    
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return build_email_report(self.sent, self.failed)
+    
+    def _start(self):
+        for i in range(self.concurrency):
+            thread = threading.Thread(target=self._worker, name=f"email-dispatcher-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                self._deliver(*job)
+            finally:
+                self._queue.task_done()
+    
+    def _deliver(self, invoice: Invoice, pdf_path: Optional[str], pdf_bytes: Optional[bytes] = None):
+        attempts = self.max_retries + 1
+        
+        for attempt in range(1, attempts + 1):
+            try:
+                with self.metrics.stage('email'):
+                    self.email_sender.deliver_invoice(invoice, pdf_path, pdf_bytes=pdf_bytes)
+                with self._lock:
+                    self.sent.append(invoice.invoice_number)
+                return
+            except Exception as e:
+                if attempt == attempts:
+                    error_msg = f"Failed to email invoice {invoice.invoice_number}: {e}"
+                    logger.error(error_msg)
+                    with self._lock:
+                        self.failed.append(error_msg)
+                    return
+                
+                delay = self.retry_backoff * (2 ** (attempt - 1))
+                logger.warning(f"Email for invoice {invoice.invoice_number} failed "
+                               f"(attempt {attempt}/{attempts}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
@@ -1,5 +1,7 @@
 import smtplib
 import os
+import queue
+import threading
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
@@ -11,35 +13,122 @@ from .config_manager import ConfigManager
 
 logger = logging.getLogger(__name__)
 
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` authenticated SMTP sessions open for reuse
+    A session dropped by the server is reopened and the send retried once.
+    """
+    
+    def __init__(self, email_settings: dict, size: int = 1):
+        self.email_settings = email_settings
+        self.size = max(1, int(size))
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+    
+    def sendmail(self, from_addr: str, recipients: List[str], text: str):
+        with self._slots:
+            server = self._checkout()
+            try:
+                try:
+                    server.sendmail(from_addr, recipients, text)
+                except smtplib.SMTPServerDisconnected:
+                    logger.info("SMTP session was disconnected, reconnecting")
+                    self._discard(server)
+                    server = self.open_session()
+                    server.sendmail(from_addr, recipients, text)
+            except Exception:
+                self._discard(server)
+                raise
+            self._idle.put(server)
+    
+    def close(self):
+        """Quit every idle session"""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(server)
+    
+    def _checkout(self) -> smtplib.SMTP:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self.open_session()
+    
+    def open_session(self) -> smtplib.SMTP:
+        """Open a new authenticated SMTP session"""
+        # Create SMTP session
+        server = smtplib.SMTP(
+            self.email_settings['smtp_server'], 
+            self.email_settings['smtp_port'],
+            timeout=self.email_settings.get('timeout', 30)
+        )
+        
+        # Enable security
+        if self.email_settings.get('use_tls', True):
+            server.starttls()
+        
+        # Login (relays that accept unauthenticated mail have no username)
+        if self.email_settings.get('username'):
+            server.login(
+                self.email_settings['username'], 
+                self.email_settings['password']
+            )
+        return server
+    
+    @staticmethod
+    def _discard(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
 class EmailSender:
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
         self.email_settings = config_manager.get_email_settings()
         self.company_info = config_manager.get_company_info()
+        self.pool_size = self.email_settings.get('pool_size', 1)
+        self._pool = None
+        self._pool_lock = threading.Lock()
     
-    def send_invoice(self, invoice: Invoice, pdf_path: str, 
-                    additional_recipients: Optional[List[str]] = None) -> bool:
-        if not self.email_settings.get('enabled', False):
+    def send_invoice(self, invoice: Invoice, pdf_path: Optional[str] = None, 
+                    additional_recipients: Optional[List[str]] = None,
+                    pdf_bytes: Optional[bytes] = None) -> bool:
+        if not self.is_enabled():
             logger.info("Email sending is disabled")
             return False
         
         try:
-            # Create message
-            msg = self._create_message(invoice, additional_recipients or [])
-            
-            # Attach PDF
-            self._attach_pdf(msg, pdf_path, invoice.invoice_number)
-            
-            # Send email
-            self._send_message(msg)
-            
-            logger.info(f"Invoice email sent successfully to {invoice.customer.email}")
+            self.deliver_invoice(invoice, pdf_path, additional_recipients, pdf_bytes)
             return True
             
         except Exception as e:
             logger.error(f"Failed to send invoice email: {e}")
             return False
     
+    def deliver_invoice(self, invoice: Invoice, pdf_path: Optional[str] = None,
+                        additional_recipients: Optional[List[str]] = None,
+                        pdf_bytes: Optional[bytes] = None):
+        """
+        Send the invoice email, raising on failure so callers can retry.
+        The attachment is pdf_bytes when given (in-memory render), else read from pdf_path.
+        """
+        # Create message
+        msg = self._create_message(invoice, additional_recipients or [])
+        
+        # Attach PDF
+        self._attach_pdf(msg, pdf_path, invoice.invoice_number, pdf_bytes)
+        
+        # Send email
+        self._send_message(msg)
+        
+        logger.info(f"Invoice email sent successfully to {invoice.customer.email}")
+    
+    def is_enabled(self) -> bool:
+        return self.email_settings.get('enabled', False)
+    
     def _create_message(self, invoice: Invoice, additional_recipients: List[str]) -> MIMEMultipart:
         msg = MIMEMultipart()
         
@@ -96,13 +185,16 @@ class EmailSender:
         
         return body
     
-    def _attach_pdf(self, msg: MIMEMultipart, pdf_path: str, invoice_number: str):
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+    def _attach_pdf(self, msg: MIMEMultipart, pdf_path: Optional[str], invoice_number: str,
+                    pdf_bytes: Optional[bytes] = None):
+        if pdf_bytes is None:
+            if not pdf_path or not os.path.exists(pdf_path):
+                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+            with open(pdf_path, "rb") as attachment:
+                pdf_bytes = attachment.read()
         
-        with open(pdf_path, "rb") as attachment:
-            part = MIMEBase('application', 'octet-stream')
-            part.set_payload(attachment.read())
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(pdf_bytes)
         
         encoders.encode_base64(part)
         
@@ -115,46 +207,34 @@ class EmailSender:
         msg.attach(part)
     
     def _send_message(self, msg: MIMEMultipart):
-        # Create SMTP session
-        server = smtplib.SMTP(
-            self.email_settings['smtp_server'], 
-            self.email_settings['smtp_port']
-        )
-        
-        # Enable security
-        server.starttls()
-        
-        # Login
-        server.login(
-            self.email_settings['username'], 
-            self.email_settings['password']
-        )
-        
-        # Send email
         text = msg.as_string()
         recipients = [msg['To']]
         
         if msg['Cc']:
             recipients.extend(msg['Cc'].split(', '))
         
-        server.sendmail(msg['From'], recipients, text)
-        server.quit()
+        # Send over a pooled session kept alive between invoices
+        self._get_pool().sendmail(msg['From'], recipients, text)
+    
+    def _get_pool(self) -> SMTPConnectionPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = SMTPConnectionPool(self.email_settings, self.pool_size)
+            return self._pool
+    
+    def close(self):
+        """Close pooled SMTP sessions, e.g. at the end of a batch"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
     
     def test_connection(self) -> bool:
         """Test email server connection"""
         try:
-            server = smtplib.SMTP(
-                self.email_settings['smtp_server'], 
-                self.email_settings['smtp_port']
-            )
-            server.starttls()
-            server.login(
-                self.email_settings['username'], 
-                self.email_settings['password']
-            )
+            server = SMTPConnectionPool(self.email_settings).open_session()
             server.quit()
             logger.info("Email connection test successful")
             return True
         except Exception as e:
             logger.error(f"Email connection test failed: {e}")
-            return False
\ No newline at end of file
+            return False
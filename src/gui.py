@@ -232,6 +232,12 @@ class InvoiceGeneratorGUI:
                 for error in errors:
                     result_text += f"   • {error}\n"
             
+            if send_email:
+                report = self.generator.email_report
+                result_text += f"\n📧 Emails sent: {report['sent_count']}, failed: {report['failed_count']}\n"
+                for failure in report['failed']:
+                    result_text += f"   • {failure}\n"
+            
             self.root.after(0, lambda: self.results_text.insert(tk.END, result_text))
             
         except Exception as e:
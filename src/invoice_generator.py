@@ -1,14 +1,43 @@
 import os
+import itertools
 import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from .config_manager import ConfigManager
-from .database import DatabaseManager
+from .database import DatabaseManager, MetadataFlushError
 from .data_validator import DataValidator
 from .pdf_generator import PDFGenerator
 from .email_sender import EmailSender
+from .email_dispatcher import EmailDispatcher, build_email_report
+from .metrics import BatchMetrics
+from .archive_writer import ArchiveWriter
 from .models import Invoice
 
+# Per-process PDF generator used by render workers (see _init_render_worker)
+_worker_pdf_generator = None
+
+def _init_render_worker(config_path: str):
+    """Build one warm PDFGenerator per worker process"""
+    global _worker_pdf_generator
+    _worker_pdf_generator = PDFGenerator(ConfigManager(config_path))
+
+def _render_in_worker(invoice: Invoice, to_bytes: bool = False) -> Tuple[Union[str, bytes], float, float, bool]:
+    """
+    Render a single invoice PDF inside a worker process
+    Returns (path, or the PDF bytes with to_bytes, wall, cpu, cache hit)
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    if to_bytes:
+        result = _worker_pdf_generator.render_to_bytes(invoice, store=False)
+    else:
+        result = _worker_pdf_generator.generate_invoice(invoice)
+    return (result, time.perf_counter() - wall_start, time.process_time() - cpu_start,
+            _worker_pdf_generator.last_render_cached)
+
 class InvoiceGenerator:
     def __init__(self, config_path: str = "config/settings.json"):
         self.config_manager = ConfigManager(config_path)
@@ -16,8 +45,11 @@ class InvoiceGenerator:
         self.validator = DataValidator()
         self.pdf_generator = PDFGenerator(self.config_manager)
         self.email_sender = EmailSender(self.config_manager)
+        self.email_report = build_email_report([], [])
+        self.skipped_count = 0
+        self.last_metrics: Optional[BatchMetrics] = None
         self._setup_logging()
-        
+    
     def _setup_logging(self):
         log_config = self.config_manager.get('logging', {})
         log_level = getattr(logging, log_config.get('level', 'INFO'))
@@ -37,73 +69,387 @@ class InvoiceGenerator:
         self.logger = logging.getLogger(__name__)
     
     def generate_invoices(self, start_date: datetime, end_date: datetime, 
-                         send_email: bool = False) -> Tuple[List[str], List[str]]:
+                         send_email: bool = False,
+                         workers: Optional[int] = None,
+                         resume: bool = False,
+                         archive: Optional[str] = None) -> Tuple[List[str], List[str]]:
         """
         Generate invoices for billing records within date range
+        With workers > 1, PDF rendering runs in a process pool while metadata
+        writes and emails stay in this process; results keep their order.
+        Emails are sent in the background and reported in self.email_report.
+        With resume=True invoices whose numbers are already in invoice_metadata
+        are skipped (counted in self.skipped_count); resumed runs, and every run
+        when processing.checkpoints is set, record a run checkpoint with each
+        metadata flush.
+        Per-stage timings are kept in self.last_metrics and reported at the end.
+        With archive ('zip' or 'tar', default from archive.enabled/format) PDFs
+        are rendered in memory and streamed into rolling archive volumes with a
+        manifest instead of being written as loose files; the returned and
+        recorded locations are then "<volume path>#<member>", and metadata for
+        an archived invoice is only written once its volume is complete.
         Returns: (successful_invoices, errors)
         """
         successful_invoices = []
         errors = []
+        metadata_writer = None
+        email_dispatcher = None
+        archive_writer = None
+        self.email_report = build_email_report([], [])
+        self.skipped_count = 0
+        metrics = self.last_metrics = BatchMetrics(self._run_key(start_date, end_date))
+        
+        if workers is None:
+            workers = self.config_manager.get('processing.workers', 1)
+        workers = max(1, int(workers))
+        
+        if archive is None and self.config_manager.get('archive.enabled', False):
+            archive = self.config_manager.get('archive.format', 'zip')
         
         try:
             # Connect to database
             self.db_manager.connect()
             
-            # Retrieve billing records
+            run_key = self._run_key(start_date, end_date)
+            checkpoints = resume or self.config_manager.get('processing.checkpoints', False)
+            if checkpoints:
+                self.db_manager.ensure_checkpoint_table()
+            previous = self._load_resume_state(run_key) if resume else None
+            metadata_writer = self.db_manager.metadata_writer(
+                run_key=run_key if checkpoints else None,
+                invoices_done=previous['invoices_done'] if previous else 0)
+            if previous:
+                metadata_writer.last_invoice_number = previous['last_invoice_number']
+            
+            if send_email and self.email_sender.is_enabled():
+                email_dispatcher = EmailDispatcher.from_settings(self.email_sender, metrics)
+            
+            # Emails go out only once an invoice's metadata row is saved, so a
+            # resumed run (which regenerates unrecorded invoices) never sends them twice
+            emails_pending = {}
+            
+            def send_recorded_emails(rows):
+                for row in rows:
+                    invoice = emails_pending.pop(row['pdf_path'], None)
+                    if invoice:
+                        self._send_recorded_email(invoice, row['pdf_path'], archive_writer is not None,
+                                                  email_dispatcher, metrics)
+            
+            if send_email:
+                metadata_writer.on_flushed = send_recorded_emails
+            
+            if archive:
+                archive_writer = ArchiveWriter.from_settings(
+                    self.config_manager, run_key, archive,
+                    on_volume_closed=lambda volume_path: metadata_writer.release())
+            
+            # Stream billing records and validate them one record at a time
             self.logger.info(f"Retrieving billing records from {start_date} to {end_date}")
-            records = self.db_manager.get_billing_records(start_date, end_date)
+            records = metrics.timed_iter('fetch', self.db_manager.iter_billing_records(start_date, end_date))
+            record_count = 0
             
-            if not records:
-                self.logger.warning("No billing records found for the specified date range")
-                return [], ["No billing records found for the specified date range"]
+            def validated_invoices():
+                nonlocal record_count
+                validated = self.validator.validate_billing_records_iter(records)
+                for invoice, validation_errors in metrics.timed_iter('validate', validated):
+                    record_count += 1
+                    errors.extend(validation_errors)
+                    if invoice:
+                        yield invoice
             
-            # Validate data and create invoices
-            self.logger.info(f"Validating {len(records)} billing records")
-            invoices, validation_errors = self.validator.validate_billing_records(records)
-            errors.extend(validation_errors)
+            invoices = validated_invoices()
+            if resume:
+                invoices = self._without_generated(invoices, self.db_manager.fetch_chunk_size)
             
-            # Generate PDFs for valid invoices
-            for invoice in invoices:
+            # Generate PDFs for valid invoices as soon as each one is complete
+            if workers > 1:
+                self.logger.info(f"Rendering invoices with {workers} worker processes")
+            
+            rendered = self._render_invoices(invoices, workers, metrics,
+                                             to_bytes=archive_writer is not None)
+            for invoice, result in rendered:
                 try:
-                    pdf_path = self._process_single_invoice(invoice, send_email)
-                    successful_invoices.append(pdf_path)
+                    if isinstance(result, Exception):
+                        raise result
+                    if archive_writer:
+                        with metrics.stage('archive'):
+                            result = archive_writer.add(invoice, self.pdf_generator.output_filename(invoice),
+                                                        result)
+                    if send_email:
+                        emails_pending[result] = invoice
+                    # Buffered; archived invoices are held until their volume is complete
+                    with metrics.stage('persist'):
+                        if archive_writer:
+                            metadata_writer.hold(invoice, result)
+                        else:
+                            metadata_writer.add(invoice, result)
+                    successful_invoices.append(result)
                     self.logger.info(f"Successfully processed invoice {invoice.invoice_number}")
-                    
+                
                 except Exception as e:
                     error_msg = f"Failed to process invoice {invoice.invoice_number}: {str(e)}"
                     errors.append(error_msg)
                     self.logger.error(error_msg)
             
-            self.logger.info(f"Batch processing complete. Success: {len(successful_invoices)}, Errors: {len(errors)}")
+            if not record_count:
+                self.logger.warning("No billing records found for the specified date range")
+                return [], ["No billing records found for the specified date range"]
             
+            # Finish the last archive volume (releasing its metadata), flush, then mark the run as finished
+            if archive_writer:
+                with metrics.stage('archive', items=0):
+                    archive_writer.close()
+            with metrics.stage('persist', items=0):
+                metadata_writer.flush()
+                # Counts carry over from the previous attempt; a resume with nothing
+                # left to do and no earlier checkpoint has nothing to record
+                if checkpoints and (metadata_writer.written or previous or not resume):
+                    self.db_manager.save_run_checkpoint({
+                        'run_key': run_key,
+                        'invoices_done': metadata_writer.invoices_done,
+                        'last_invoice_number': metadata_writer.last_invoice_number,
+                        'status': 'complete'
+                    })
+            
+            if self.skipped_count:
+                self.logger.info(f"Skipped {self.skipped_count} invoices already generated")
+            self.logger.info(f"Batch processing complete. Success: {len(successful_invoices)}, Errors: {len(errors)}")
+        
+        except MetadataFlushError as e:
+            # The rows stay buffered; retried (and reported) by the flush below
+            self.logger.warning(str(e))
+        
         except Exception as e:
             error_msg = f"Batch processing failed: {str(e)}"
             errors.append(error_msg)
             self.logger.error(error_msg)
-            
+        
         finally:
+            if archive_writer:
+                try:
+                    archive_writer.close()
+                except Exception as e:
+                    errors.append(f"Could not finish archive: {e}")
+                    self.logger.error(f"Could not finish archive: {e}")
+            if metadata_writer:
+                held = metadata_writer.discard_held()
+                if held:
+                    error_msg = (f"Metadata not recorded for {len(held)} invoices: "
+                                 f"their archive volume was not completed")
+                    errors.append(error_msg)
+                    self.logger.error(error_msg)
+                    incomplete = {row['pdf_path'] for row in held}
+                    successful_invoices = [path for path in successful_invoices if path not in incomplete]
+                try:
+                    metadata_writer.flush()
+                except MetadataFlushError as e:
+                    # Not recorded means not done: a resumed run generates these again
+                    errors.append(str(e))
+                    self.logger.error(str(e))
+                    unsaved = {row['pdf_path'] for row in e.rows}
+                    successful_invoices = [path for path in successful_invoices if path not in unsaved]
+            if email_dispatcher:
+                self.email_report = email_dispatcher.close()
+                self.logger.info(f"Email dispatch complete. Sent: {self.email_report['sent_count']}, "
+                                 f"Failed: {self.email_report['failed_count']}")
             self.db_manager.close()
+            self.email_sender.close()
+            self._report_metrics(metrics, len(successful_invoices), len(errors))
         
         return successful_invoices, errors
     
+    def _report_metrics(self, metrics: BatchMetrics, successful: int, errors: int):
+        """Log the stage summary and write the JSON / Prometheus reports"""
+        metrics.finish()
+        metrics.increment('invoices_succeeded', successful)
+        metrics.increment('errors', errors)
+        metrics.increment('invoices_skipped', self.skipped_count)
+        metrics.increment('emails_sent', self.email_report['sent_count'])
+        metrics.increment('emails_failed', self.email_report['failed_count'])
+        
+        metrics_config = self.config_manager.get('metrics', {})
+        if not metrics_config.get('enabled', True):
+            return
+        
+        self.logger.info("Batch stage timings:\n" + metrics.summary_table())
+        try:
+            report_folder = metrics_config.get('report_folder', 'output/reports')
+            if report_folder:
+                report_path = metrics.write_json(report_folder)
+                self.logger.info(f"Batch metrics report written: {report_path}")
+            
+            prometheus_file = metrics_config.get('prometheus_file')
+            if prometheus_file:
+                metrics.write_prometheus(prometheus_file)
+        except OSError as e:
+            self.logger.warning(f"Could not write batch metrics: {e}")
+    
+    @staticmethod
+    def _run_key(start_date: datetime, end_date: datetime) -> str:
+        return f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
+    
+    def _load_resume_state(self, run_key: str) -> Optional[Dict[str, Any]]:
+        """Checkpoint of the previous attempt of this run, if it recorded one"""
+        checkpoint = self.db_manager.get_run_checkpoint(run_key)
+        if not checkpoint:
+            return None
+        self.logger.info(f"Resuming run {run_key} ({checkpoint['status']}): "
+                         f"{checkpoint['invoices_done']} invoices recorded, last {checkpoint['last_invoice_number']}")
+        return checkpoint
+    
+    def _without_generated(self, invoices: Iterable[Invoice], chunk_size: int) -> Iterator[Invoice]:
+        """
+        Drop invoices whose numbers are already in invoice_metadata
+        Numbers are looked up chunk_size at a time, so the stream stays bounded
+        and it does not matter which date range the earlier run used.
+        """
+        invoices = iter(invoices)
+        while True:
+            chunk = list(itertools.islice(invoices, max(1, chunk_size)))
+            if not chunk:
+                return
+            generated = self.db_manager.get_generated_invoice_numbers(
+                invoice.invoice_number for invoice in chunk)
+            for invoice in chunk:
+                if invoice.invoice_number in generated:
+                    self.skipped_count += 1
+                else:
+                    yield invoice
+    
+    def _render_invoices(self, invoices: Iterable[Invoice], workers: int = 1,
+                         metrics: Optional[BatchMetrics] = None,
+                         to_bytes: bool = False) -> Iterator[Tuple[Invoice, Union[str, bytes, Exception]]]:
+        """
+        Render invoice PDFs in input order, yielding (invoice, pdf_path or error),
+        or (invoice, pdf bytes or error) with to_bytes
+        A pool is only started for workers > 1; at most workers * 4 invoices
+        are in flight so memory stays bounded on large batches.
+        """
+        metrics = metrics or BatchMetrics()
+        
+        if workers <= 1:
+            for invoice in invoices:
+                try:
+                    with metrics.stage('render'):
+                        if to_bytes:
+                            pdf = self.pdf_generator.render_to_bytes(invoice, store=False)
+                        else:
+                            pdf = self.pdf_generator.generate_invoice(invoice)
+                    self._count_cache_lookup(metrics, self.pdf_generator.last_render_cached)
+                    yield invoice, pdf
+                except Exception as e:
+                    yield invoice, e
+            return
+        
+        max_in_flight = workers * 4
+        pending = deque()
+        
+        # Spawned rather than forked: the email dispatcher threads may already be running
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_render_worker,
+                                 initargs=(self.config_manager.config_path,)) as executor:
+            for invoice in invoices:
+                pending.append((invoice, executor.submit(_render_in_worker, invoice, to_bytes)))
+                if len(pending) >= max_in_flight:
+                    yield self._collect_render(*pending.popleft(), metrics)
+            
+            while pending:
+                yield self._collect_render(*pending.popleft(), metrics)
+    
+    def _collect_render(self, invoice: Invoice, future,
+                        metrics: BatchMetrics) -> Tuple[Invoice, Union[str, bytes, Exception]]:
+        try:
+            pdf, wall, cpu, cached = future.result()
+        except Exception as e:
+            return invoice, e
+        metrics.add('render', wall, cpu)
+        self._count_cache_lookup(metrics, cached)
+        return invoice, pdf
+    
+    def _count_cache_lookup(self, metrics: BatchMetrics, cached: bool):
+        # Workers build their cache from the same config, so this process's setting applies
+        if self.pdf_generator.cache:
+            metrics.increment('pdf_cache_hits' if cached else 'pdf_cache_misses')
+    
     def _process_single_invoice(self, invoice: Invoice, send_email: bool = False) -> str:
         """Process a single invoice: generate PDF, save metadata, optionally send email"""
         
         # Generate PDF
         pdf_path = self.pdf_generator.generate_invoice(invoice)
         
+        self._finalize_invoice(invoice, pdf_path, send_email)
+        return pdf_path
+    
+    def _finalize_invoice(self, invoice: Invoice, pdf_path: str, send_email: bool = False):
+        """Save metadata and optionally email an already rendered invoice"""
+        
         # Save metadata to database
         self.db_manager.save_invoice_metadata(invoice, pdf_path)
         
         # Send email if requested
         if send_email:
-            email_sent = self.email_sender.send_invoice(invoice, pdf_path)
-            if email_sent:
-                self.logger.info(f"Email sent for invoice {invoice.invoice_number}")
-            else:
-                self.logger.warning(f"Failed to send email for invoice {invoice.invoice_number}")
+            self._send_invoice_email(invoice, pdf_path)
+    
+    def _send_recorded_email(self, invoice: Invoice, location: str, archived: bool,
+                             email_dispatcher: Optional[EmailDispatcher], metrics: BatchMetrics):
+        """Email a batch invoice whose metadata was just saved; archived PDFs are read back from their volume"""
+        try:
+            pdf_bytes = ArchiveWriter.read_member(location) if archived else None
+        except (OSError, KeyError) as e:
+            self.logger.error(f"Could not read archived invoice {invoice.invoice_number} for email: {e}")
+            return
+        attachment_path = None if archived else location
+        if email_dispatcher:
+            email_dispatcher.submit(invoice, attachment_path, pdf_bytes)
+        else:
+            self._send_invoice_email(invoice, attachment_path, pdf_bytes, metrics)
+    
+    def _send_invoice_email(self, invoice: Invoice, pdf_path: Optional[str], pdf_bytes: Optional[bytes] = None,
+                            metrics: Optional[BatchMetrics] = None):
+        metrics = metrics or BatchMetrics()
+        with metrics.stage('email'):
+            email_sent = self.email_sender.send_invoice(invoice, pdf_path, pdf_bytes=pdf_bytes)
+        if email_sent:
+            self.logger.info(f"Email sent for invoice {invoice.invoice_number}")
+        else:
+            self.logger.warning(f"Failed to send email for invoice {invoice.invoice_number}")
+    
+    def generate_print_run(self, start_date: datetime, end_date: datetime,
+                           output_path: Optional[str] = None) -> Tuple[Optional[str], int, List[str]]:
+        """
+        Render all invoices in the date range into one combined PDF for printing
+        (one page run per invoice, bookmarked by invoice number). Metadata and
+        emails are left to generate_invoices.
+        Returns: (output_path or None if nothing was rendered, invoice_count, errors)
+        """
+        errors = []
+        if not output_path:
+            output_path = os.path.join(self.config_manager.get('output.folder', 'output'), 'print_runs',
+                                       f"print_run_{self._run_key(start_date, end_date)}.pdf")
         
-        return pdf_path
+        try:
+            self.db_manager.connect()
+            self.logger.info(f"Retrieving billing records from {start_date} to {end_date}")
+            records = self.db_manager.iter_billing_records(start_date, end_date)
+            
+            def valid_invoices():
+                for invoice, validation_errors in self.validator.validate_billing_records_iter(records):
+                    errors.extend(validation_errors)
+                    if invoice:
+                        yield invoice
+            
+            invoices = valid_invoices()
+            first_invoice = next(invoices, None)
+            if first_invoice is None:
+                self.logger.warning("No valid invoices found for the specified date range")
+                return None, 0, errors or ["No billing records found for the specified date range"]
+            
+            count = self.pdf_generator.generate_print_run(itertools.chain([first_invoice], invoices), output_path)
+            return output_path, count, errors
+        
+        finally:
+            self.db_manager.close()
     
     def generate_single_invoice(self, invoice: Invoice, send_email: bool = False) -> str:
         """Generate a single invoice from Invoice object"""
@@ -114,6 +460,7 @@ class InvoiceGenerator:
             return pdf_path
         finally:
             self.db_manager.close()
+            self.email_sender.close()
     
     def test_email_connection(self) -> bool:
         """Test email server connection"""
@@ -124,6 +471,10 @@ class InvoiceGenerator:
         preview_path = os.path.join("output", "preview", f"preview_{invoice.invoice_number}.pdf")
         return self.pdf_generator.generate_invoice(invoice, preview_path)
     
+    def get_invoice_preview_bytes(self, invoice: Invoice) -> bytes:
+        """Render an invoice preview in memory; nothing is written to disk or the database"""
+        return self.pdf_generator.render_to_bytes(invoice)
+    
     def validate_configuration(self) -> List[str]:
         """Validate system configuration"""
         issues = []
@@ -137,16 +488,18 @@ class InvoiceGenerator:
                 except Exception as e:
                     issues.append(f"Cannot create directory {dir_name}: {e}")
         
-        # Check database connection
+        # Check database connection (borrowed from the shared pool)
         try:
             self.db_manager.connect()
-            self.db_manager.close()
+            self.db_manager.ping()
         except Exception as e:
             issues.append(f"Database connection failed: {e}")
+        finally:
+            self.db_manager.close()
         
         # Check email configuration if enabled
         if self.config_manager.get('email.enabled', False):
             if not self.email_sender.test_connection():
                 issues.append("Email server connection failed")
         
-        return issues
\ No newline at end of file
+        return issues
@@ -0,0 +1,130 @@
+import logging
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from reportlab.platypus import Flowable, Table, TableStyle
+from .models import InvoiceItem
+
+logger = logging.getLogger(__name__)
+
+# (header height, body row height without text, height per text line) per style and widths
+_row_metrics: Dict[Tuple[int, Tuple[float, ...]], Tuple[float, float, float]] = {}
+
+def _measure_rows(header: List[str], col_widths: List[float], style: TableStyle) -> Tuple[float, float, float]:
+    """Row heights as platypus Table computes them, from a three-row sample table"""
+    key = (id(style), tuple(col_widths))
+    if key not in _row_metrics:
+        sample = Table([header, [''] * len(header), ['\n'] * len(header)], colWidths=col_widths)
+        sample.setStyle(style)
+        sample.wrap(sum(col_widths), 1e6)
+        header_height, one_line, two_lines = sample._rowHeights
+        per_line = two_lines - one_line
+        _row_metrics[key] = (header_height, one_line - per_line, per_line)
+    return _row_metrics[key]
+
+class PagedItemsTable(Flowable):
+    """
+    Line items table that is laid out one page at a time. Each split builds a
+    platypus Table for only the rows that fit, repeating the header and adding
+    "Carried forward" / "Brought forward" subtotal rows, so layout work and
+    memory follow the page rather than the whole invoice. An invoice whose
+    items fit where they start is drawn exactly like a single Table.
+    """
+    
+    def __init__(self, items: Sequence[InvoiceItem], header: List[str], col_widths: List[float],
+                 style: TableStyle, format_row: Callable[[InvoiceItem], List[str]],
+                 format_amount: Callable[[Decimal], str], start: int = 0,
+                 brought_forward: Decimal = Decimal('0')):
+        super().__init__()
+        self.items = items
+        self.header = header
+        self.col_widths = col_widths
+        self.style = style
+        self.format_row = format_row
+        self.format_amount = format_amount
+        self.start = start
+        self.brought_forward = brought_forward
+        self.header_height, self.row_padding, self.line_height = _measure_rows(header, col_widths, style)
+        self.width = sum(col_widths)
+        self.hAlign = 'CENTER'
+        self._table = None
+    
+    def _row_height(self, index: int) -> float:
+        lines = str(self.items[index].description).count('\n') + 1
+        return self.row_padding + lines * self.line_height
+    
+    def _subtotal_row_height(self) -> float:
+        return self.row_padding + self.line_height
+    
+    def _fixed_height(self) -> float:
+        height = self.header_height
+        if self.start:
+            height += self._subtotal_row_height()
+        return height
+    
+    def wrap(self, availWidth, availHeight):
+        # Stop measuring once past the available height; split() handles the rest
+        height = self._fixed_height()
+        for index in range(self.start, len(self.items)):
+            height += self._row_height(index)
+            if height > availHeight:
+                self.height = height
+                return self.width, height
+        self.height = height
+        self._table = self._build_table(len(self.items))
+        self._table.wrap(availWidth, availHeight)
+        return self.width, height
+    
+    def split(self, availWidth, availHeight):
+        used = self._fixed_height()
+        carried_height = self._subtotal_row_height()
+        end = self.start
+        while end < len(self.items):
+            # A page that stops before the last item also needs a "Carried forward" row
+            reserve = carried_height if end + 1 < len(self.items) else 0
+            row_height = self._row_height(end)
+            if used + row_height + reserve > availHeight:
+                break
+            used += row_height
+            end += 1
+        
+        if end == self.start:
+            return []
+        if end == len(self.items):
+            return [self._build_table(end)]
+        
+        carried_forward = self.brought_forward + sum(
+            (item.total for item in self.items[self.start:end]), Decimal('0'))
+        logger.debug(f"Items table split after row {end} of {len(self.items)}")
+        return [
+            self._build_table(end, carried_forward),
+            PagedItemsTable(self.items, self.header, self.col_widths, self.style, self.format_row,
+                            self.format_amount, start=end, brought_forward=carried_forward)
+        ]
+    
+    def _build_table(self, end: int, carried_forward: Optional[Decimal] = None) -> Table:
+        """Table for items[start:end] with the header and any subtotal rows"""
+        data = [self.header]
+        subtotal_rows = []
+        if self.start:
+            subtotal_rows.append(len(data))
+            data.append(self._subtotal_row('Brought forward:', self.brought_forward))
+        data.extend(self.format_row(item) for item in self.items[self.start:end])
+        if carried_forward is not None:
+            subtotal_rows.append(len(data))
+            data.append(self._subtotal_row('Carried forward:', carried_forward))
+        
+        table = Table(data, colWidths=self.col_widths)
+        table.setStyle(self.style)
+        for row in subtotal_rows:
+            table.setStyle(TableStyle([
+                ('SPAN', (0, row), (-2, row)),
+                ('ALIGN', (0, row), (-1, row), 'RIGHT'),
+                ('FONTNAME', (0, row), (-1, row), 'Helvetica-Oblique'),
+            ]))
+        return table
+    
+    def _subtotal_row(self, label: str, amount: Decimal) -> List[str]:
+        return [label] + [''] * (len(self.header) - 2) + [self.format_amount(amount)]
+    
+    def draw(self):
+        self._table.drawOn(self.canv, 0, 0)
@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in report order
+STAGES = ('fetch', 'validate', 'render', 'persist', 'email')
+
+class StageStats:
+    def __init__(self):
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.items = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'items': self.items
+        }
+
+class BatchMetrics:
+    """
+    Wall time, CPU time and item counts per pipeline stage of one batch run
+    Nested stages are exclusive: time spent in an inner stage (e.g. fetch while
+    the validator pulls rows) is not counted again in the outer one. CPU time is
+    per thread, so background email threads do not inflate main-thread stages.
+    """
+    
+    def __init__(self, run_key: Optional[str] = None):
+        self.run_key = run_key
+        self.started_at = datetime.now()
+        self.stages: Dict[str, StageStats] = {name: StageStats() for name in STAGES}
+        self.counters: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    @contextmanager
+    def stage(self, name: str, items: int = 1):
+        """Time a block of work and attribute it to a stage"""
+        stack = self._stack()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        stack.append([0.0, 0.0])
+        try:
+            yield
+        finally:
+            child_wall, child_cpu = stack.pop()
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+            self.add(name, wall - child_wall, cpu - child_cpu, items)
+    
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """Attribute the time spent producing each item of an iterable to a stage"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name, items=0):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            self.add(name, 0.0, 0.0, 1)
+            yield item
+    
+    def add(self, name: str, wall_seconds: float, cpu_seconds: float, items: int = 1):
+        """Record work measured elsewhere (worker processes, email threads)"""
+        with self._lock:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.wall_seconds += wall_seconds
+            stats.cpu_seconds += cpu_seconds
+            stats.items += items
+    
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+    
+    def finish(self):
+        self._finished = time.perf_counter()
+    
+    @property
+    def duration_seconds(self) -> float:
+        return (self._finished or time.perf_counter()) - self._started
+    
+    def _stack(self) -> List[List[float]]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'run_key': self.run_key,
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'duration_seconds': round(self.duration_seconds, 6),
+                'stages': {name: stats.to_dict() for name, stats in self.stages.items()},
+                'counters': dict(self.counters)
+            }
+    
+    def summary_table(self) -> str:
+        lines = [f"{'stage':<10}{'wall s':>10}{'cpu s':>10}{'items':>8}{'ms/item':>10}"]
+        lines.append('-' * len(lines[0]))
+        for name, stats in self.stages.items():
+            per_item = f"{stats.wall_seconds * 1000 / stats.items:.2f}" if stats.items else '-'
+            lines.append(f"{name:<10}{stats.wall_seconds:>10.3f}{stats.cpu_seconds:>10.3f}"
+                         f"{stats.items:>8}{per_item:>10}")
+        lines.append(f"{'total':<10}{self.duration_seconds:>10.3f}")
+        if self.counters:
+            lines.append(', '.join(f"{key}={value}" for key, value in sorted(self.counters.items())))
+        return '\n'.join(lines)
+    
+    def write_json(self, folder: str) -> str:
+        os.makedirs(folder, exist_ok=True)
+        filename = f"batch_{self.run_key or 'run'}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        path = os.path.join(folder, filename)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+    
+    def write_prometheus(self, path: str):
+        """Write a node_exporter textfile-collector file (atomically replaced)"""
+        report = self.to_dict()
+        lines = [
+            '# HELP invoice_batch_stage_wall_seconds Wall time per stage in the last batch run',
+            '# TYPE invoice_batch_stage_wall_seconds gauge'
+        ]
+        lines += [f'invoice_batch_stage_wall_seconds{{stage="{name}"}} {stats["wall_seconds"]}'
+                  for name, stats in report['stages'].items()]
+        lines += [
+            '# HELP invoice_batch_stage_cpu_seconds CPU time per stage in the last batch run',
+            '# TYPE invoice_batch_stage_cpu_seconds gauge'
+        ]
+        lines += [f'invoice_batch_stage_cpu_seconds{{stage="{name}"}} {stats["cpu_seconds"]}'
+                  for name, stats in report['stages'].items()]
+        lines += [
+            '# HELP invoice_batch_stage_items Items processed per stage in the last batch run',
+            '# TYPE invoice_batch_stage_items gauge'
+        ]
+        lines += [f'invoice_batch_stage_items{{stage="{name}"}} {stats["items"]}'
+                  for name, stats in report['stages'].items()]
+        lines += [
+            '# HELP invoice_batch_count Counters of the last batch run',
+            '# TYPE invoice_batch_count gauge'
+        ]
+        lines += [f'invoice_batch_count{{counter="{key}"}} {value}'
+                  for key, value in sorted(report['counters'].items())]
+        lines += [
+            '# HELP invoice_batch_duration_seconds Duration of the last batch run',
+            '# TYPE invoice_batch_duration_seconds gauge',
+            f'invoice_batch_duration_seconds {report["duration_seconds"]}',
+            '# HELP invoice_batch_last_run_timestamp_seconds Start time of the last batch run',
+            '# TYPE invoice_batch_last_run_timestamp_seconds gauge',
+            f'invoice_batch_last_run_timestamp_seconds {self.started_at.timestamp():.0f}'
+        ]
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, path)
@@ -0,0 +1,183 @@
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from .config_manager import ConfigManager
+from .models import Invoice
+
+logger = logging.getLogger(__name__)
+
+def invoice_fingerprint(invoice: Invoice) -> str:
+    """Canonical JSON of an invoice: the same content always gives the same string"""
+    return json.dumps(invoice.model_dump(mode='json'), sort_keys=True, separators=(',', ':'))
+
+class PDFCache:
+    """
+    Content-addressed store of rendered invoice PDFs on disk
+    Entries are keyed on a hash of the canonical invoice plus a fingerprint of
+    everything else that shapes the output (company details, settings, logo,
+    template version), so a hit is always byte-for-byte what a render would
+    write. The folder is kept under max_bytes by evicting least recently used
+    entries. Several processes may share a folder; each keeps its own index.
+    """
+    
+    def __init__(self, folder: str, max_bytes: int, fingerprint: str = ''):
+        self.folder = folder
+        self.max_bytes = max(0, int(max_bytes))
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> size in bytes, least recently used first
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(folder, exist_ok=True)
+        self._load_index()
+    
+    @classmethod
+    def from_settings(cls, config_manager: ConfigManager, fingerprint: str = '') -> Optional['PDFCache']:
+        """Build a cache from the cache config section; None when it is disabled"""
+        settings = config_manager.get('cache', {})
+        if not settings.get('enabled', False):
+            return None
+        return cls(
+            settings.get('folder', 'output/cache'),
+            max_bytes=int(settings.get('max_size_mb', 256) * 1024 * 1024),
+            fingerprint=fingerprint
+        )
+    
+    def key(self, invoice: Invoice) -> str:
+        digest = hashlib.sha256(self.fingerprint.encode('utf-8'))
+        digest.update(invoice_fingerprint(invoice).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, key[:2], f"{key}.pdf")
+    
+    def get_path(self, key: str) -> Optional[str]:
+        """Path of the cached PDF, or None on a miss"""
+        path = self.path(key)
+        if not os.path.exists(path):
+            self._record_miss(key)
+            return None
+        self._record_hit(key, path)
+        return path
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._record_miss(key)
+            return None
+        self._record_hit(key, self.path(key))
+        return data
+    
+    def put_bytes(self, key: str, data: bytes) -> str:
+        """Store a rendered PDF; written to a temp file first so readers never see half a file"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._add_entry(key, len(data))
+        return path
+    
+    def put_file(self, key: str, source_path: str) -> str:
+        with open(source_path, 'rb') as f:
+            return self.put_bytes(key, f.read())
+    
+    def copy_to(self, key: str, output_path: str) -> bool:
+        """Copy a cached PDF to output_path; False (nothing copied) on a miss"""
+        cached_path = self.get_path(key)
+        if cached_path is None:
+            return False
+        try:
+            shutil.copyfile(cached_path, output_path)
+        except FileNotFoundError:
+            # Evicted by another process in between
+            return False
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+    
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+    
+    def _load_index(self):
+        """Index the entries already on disk, oldest modification first"""
+        found = []
+        for directory, _, filenames in os.walk(self.folder):
+            for filename in filenames:
+                if filename.endswith('.pdf'):
+                    stat = os.stat(os.path.join(directory, filename))
+                    found.append((stat.st_mtime, filename[:-4], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        if found:
+            logger.info(f"PDF cache loaded {len(found)} entries ({self._total_bytes} bytes) from {self.folder}")
+        self._evict()
+    
+    def _record_hit(self, key: str, path: str):
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                # Written by another process sharing the folder
+                self._entries[key] = os.path.getsize(path)
+                self._total_bytes += self._entries[key]
+        try:
+            # The modification time carries recency across restarts
+            os.utime(path)
+        except OSError:
+            pass
+    
+    def _record_miss(self, key: str):
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+    
+    def _add_entry(self, key: str, size: int):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+    
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+    
+    def _remove(self, key: str):
+        self._total_bytes -= self._entries.pop(key)
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+        logger.debug(f"PDF cache evicted {key}")
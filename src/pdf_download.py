@@ -0,0 +1,91 @@
+import os
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import quote
+from flask import abort, current_app, request
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+from .config_manager import ConfigManager
+
+logger = logging.getLogger(__name__)
+
+class PDFDownloads:
+    """
+    Serves generated PDFs with content ETags, conditional and range requests
+    The ETag is a SHA-256 of the file content, remembered per (path, size,
+    mtime), so an unchanged invoice revalidates with a 304 and resumed downloads
+    get 206 partial content. The body goes out through the WSGI server's file
+    wrapper (sendfile where the server supports it), or is handed to the front
+    server with X-Sendfile (Apache, lighttpd) or X-Accel-Redirect (nginx).
+    max_age defaults to 0 (always revalidate) because regenerating an invoice
+    overwrites its file under the same name.
+    """
+    
+    def __init__(self, max_age: int = 0, x_sendfile: bool = False,
+                 accel_redirect_prefix: Optional[str] = None, max_etags: int = 4096):
+        self.max_age = int(max_age)
+        self.x_sendfile = x_sendfile
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip('/') if accel_redirect_prefix else None
+        self.max_etags = max(1, int(max_etags))
+        self._lock = threading.Lock()
+        # (path, size, mtime_ns) -> content digest, least recently used first
+        self._etags: 'OrderedDict[Tuple[str, int, int], str]' = OrderedDict()
+    
+    @classmethod
+    def from_settings(cls, config_manager: ConfigManager) -> 'PDFDownloads':
+        """Build from the web.download config section"""
+        settings = config_manager.get('web.download', {})
+        return cls(
+            max_age=settings.get('max_age', 0),
+            x_sendfile=settings.get('x_sendfile', False),
+            accel_redirect_prefix=settings.get('accel_redirect_prefix')
+        )
+    
+    def send(self, folder: str, filename: str, as_attachment: bool = True):
+        """Response for folder/filename; 404 for missing files and names outside the folder"""
+        path = safe_join(os.path.abspath(folder), filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        
+        stat = os.stat(path)
+        offload = self.x_sendfile or bool(self.accel_redirect_prefix)
+        response = send_file(
+            path,
+            request.environ,
+            mimetype='application/pdf',
+            as_attachment=as_attachment,
+            download_name=os.path.basename(path),
+            conditional=True,
+            etag=self._etag(path, stat),
+            max_age=self.max_age,
+            use_x_sendfile=offload,
+            response_class=current_app.response_class
+        )
+        if self.accel_redirect_prefix and 'X-Sendfile' in response.headers:
+            del response.headers['X-Sendfile']
+            relative = os.path.relpath(path, os.path.abspath(folder)).replace(os.sep, '/')
+            response.headers['X-Accel-Redirect'] = f"{self.accel_redirect_prefix}/{quote(relative)}"
+        return response
+    
+    def _etag(self, path: str, stat: os.stat_result) -> str:
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            etag = self._etags.get(key)
+            if etag is not None:
+                self._etags.move_to_end(key)
+                return etag
+        
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        etag = digest.hexdigest()
+        
+        with self._lock:
+            self._etags[key] = etag
+            while len(self._etags) > self.max_etags:
+                self._etags.popitem(last=False)
+        return etag
@@ -1,27 +1,286 @@
 import os
-from datetime import datetime
+import copy
+import json
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Optional
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.lib.utils import ImageReader, TimeStamp
+from reportlab.pdfbase.pdfdoc import PDFImageXObject
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import (SimpleDocTemplate, BaseDocTemplate, PageBreak,
+                                Table, TableStyle, Paragraph, Spacer, Image, Flowable)
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+from PIL import Image as PILImage
+import reportlab
 import logging
-from .models import Invoice
+from .models import Invoice, InvoiceItem
 from .config_manager import ConfigManager
+from .items_table import PagedItemsTable
+from .pdf_cache import PDFCache, invoice_fingerprint
+from . import reportlab_compat
 
 logger = logging.getLogger(__name__)
 
+# Logo is drawn in a 2" x 1" box; pixels beyond this resolution are never visible
+LOGO_SIZE = (2*inch, 1*inch)
+LOGO_DPI = 150
+
+# Decoded, pre-scaled logos shared by every generator in the process,
+# keyed by (path, mtime, target size, JPEG quality)
+_logo_cache: Dict[Tuple[str, float, Tuple[int, int], Optional[int]], ImageReader] = {}
+_logo_cache_lock = threading.Lock()
+
+# Encoded image XObjects for the cached logos, keyed by id() of their ImageReader
+# and whether streams were ASCII85 encoded
+_logo_xobjects: Dict[Tuple[int, bool], Optional[PDFImageXObject]] = {}
+
+class _StreamEncodingGate:
+    """
+    Shares ReportLab's process-wide rl_config.useA85 between concurrent builds
+    ReportLab reads it while a document is drawn and saved and has no
+    per-document option. Builds wanting the current value run side by side;
+    the value is only switched while no build is running.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._active = 0
+    
+    @contextmanager
+    def use(self, ascii85: bool) -> Iterator[None]:
+        with self._condition:
+            while self._active and bool(rl_config.useA85) != ascii85:
+                self._condition.wait()
+            rl_config.useA85 = 1 if ascii85 else 0
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                if not self._active:
+                    self._condition.notify_all()
+
+_stream_encoding = _StreamEncodingGate()
+
+INFO_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+])
+
+ITEMS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+TOTALS_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('FONTSIZE', (0, -1), (-1, -1), 14),
+    ('TEXTCOLOR', (0, -1), (-1, -1), colors.darkred),
+    ('LINEBELOW', (0, -2), (-1, -2), 1, colors.black),
+    ('LINEBELOW', (0, -1), (-1, -1), 2, colors.black),
+])
+
+def load_logo(logo_path: str, size: Tuple[float, float] = LOGO_SIZE, dpi: int = LOGO_DPI,
+              jpeg_quality: Optional[int] = None) -> ImageReader:
+    """
+    Decode a logo once per process, downscaled to the pixels needed at the drawn size
+    With jpeg_quality the scaled image is re-encoded as JPEG, which PDFs embed as is
+    (DCTDecode) instead of as Flate-compressed raw pixels.
+    """
+    max_pixels = (int(size[0] / inch * dpi), int(size[1] / inch * dpi))
+    key = (os.path.abspath(logo_path), os.path.getmtime(logo_path), max_pixels, jpeg_quality)
+    with _logo_cache_lock:
+        reader = _logo_cache.get(key)
+        if reader is None:
+            with PILImage.open(logo_path) as image:
+                image.load()
+                if image.width > max_pixels[0] or image.height > max_pixels[1]:
+                    image.thumbnail(max_pixels, PILImage.LANCZOS)
+                    scaled = image
+                else:
+                    scaled = image.copy()
+            if jpeg_quality:
+                reader = ImageReader(_encode_jpeg(scaled, jpeg_quality))
+            else:
+                reader = ImageReader(scaled)
+            reader.getRGBData()
+            _logo_cache[key] = reader
+        return reader
+
+def _encode_jpeg(image: PILImage.Image, quality: int) -> BytesIO:
+    """JPEG bytes of an image; transparent areas are flattened onto white"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        image = PILImage.new('RGB', rgba.size, 'white')
+        image.paste(rgba, mask=rgba.getchannel('A'))
+    elif image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=int(quality), optimize=True)
+    buffer.seek(0)
+    return buffer
+
+def _logo_xobject(reader: ImageReader) -> Optional[PDFImageXObject]:
+    """Compress and encode a cached logo once; None when drawImage has to encode it"""
+    # Stream encoding follows rl_config at the time the XObject is built
+    key = (id(reader), bool(rl_config.useA85))
+    with _logo_cache_lock:
+        if key not in _logo_xobjects:
+            _logo_xobjects[key] = reportlab_compat.image_xobject(reader)
+        return _logo_xobjects[key]
+
+class LogoFlowable(Flowable):
+    """Draws a shared ImageReader; unlike platypus Image it never touches the file"""
+    
+    def __init__(self, reader: ImageReader, width: float, height: float, hAlign: str = 'CENTER'):
+        super().__init__()
+        self.reader = reader
+        self.width = width
+        self.height = height
+        self.hAlign = hAlign
+    
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+    
+    def draw(self):
+        self._register_xobject()
+        self.canv.drawImage(self.reader, 0, 0, self.width, self.height, mask='auto')
+    
+    def _register_xobject(self):
+        """Give this document a copy of the pre-encoded image so drawImage skips re-encoding"""
+        prototype = _logo_xobject(self.reader)
+        if prototype is not None:
+            reportlab_compat.register_xobject(self.canv, prototype)
+
+class InvoiceBookmark(Flowable):
+    """Zero-size marker that adds an outline entry for the page an invoice starts on"""
+    
+    def __init__(self, key: str, title: str):
+        super().__init__()
+        self.key = key
+        self.title = title
+        self.width = self.height = 0
+    
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+    
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, level=0)
+        self.canv.showOutline()
+
+class DocumentIdentity:
+    """
+    Creation date and file /ID for deterministic output, in place of the
+    wall-clock time and the time-seeded digest ReportLab uses: the date is the
+    latest invoice issue date and the ID a hash of the rendered content
+    """
+    
+    def __init__(self, render_fingerprint: str):
+        self._digest = hashlib.sha256(render_fingerprint.encode('utf-8'))
+        self.issue_date: Optional[datetime] = None
+    
+    def add(self, invoice: Invoice):
+        self._digest.update(invoice_fingerprint(invoice).encode('utf-8'))
+        if self.issue_date is None or invoice.issue_date > self.issue_date:
+            self.issue_date = invoice.issue_date
+    
+    def apply(self, canv: Canvas):
+        """Pin the identity on a canvas before it is saved"""
+        reportlab_compat.pin_identity(canv, self._timestamp(), self._digest.digest()[:16])
+    
+    def canvasmaker(self):
+        """Canvas factory for DocTemplate.build()"""
+        def make_canvas(*args, **kwargs):
+            if not reportlab_compat.INTERNALS_SUPPORTED:
+                # Still reproducible, but dated 2000-01-01 with an ID hashed from the content
+                kwargs['invariant'] = 1
+                return Canvas(*args, **kwargs)
+            canv = Canvas(*args, **kwargs)
+            self.apply(canv)
+            return canv
+        return make_canvas
+    
+    def _timestamp(self) -> TimeStamp:
+        when = self.issue_date
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        offset_minutes = int(when.utcoffset().total_seconds() // 60)
+        stamp = TimeStamp(invariant=1)
+        stamp.t = when.timestamp()
+        stamp.lt = when.timetuple()
+        stamp.YMDhms = tuple(stamp.lt)[:6]
+        stamp.dhh, stamp.dmm = int(offset_minutes / 60), abs(offset_minutes) % 60
+        stamp.tzname = when.tzname()
+        return stamp
+
+# Page geometry of the invoice layout
+PAGE_SIZE = A4
+PAGE_MARGINS = {'left': inch, 'right': inch, 'top': 0.5*inch, 'bottom': inch}
+
+# Part of the PDF cache fingerprint: bump whenever a code change alters the rendered output
+TEMPLATE_VERSION = 1
+
+# Output settings that choose where a PDF goes rather than what is in it
+_OUTPUT_LOCATION_SETTINGS = ('folder', 'filename_format')
+
 class PDFGenerator:
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
         self.company_info = config_manager.get_company_info()
         self.invoice_settings = config_manager.get_invoice_settings()
         self.output_settings = config_manager.get_output_settings()
+        self.cache_static = self.output_settings.get('cache_static', True)
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self.paged_items = self.output_settings.get('paged_items_table', True)
+        self._header_cache: Optional[List[Flowable]] = None
+        self._footer_cache: Optional[List[Flowable]] = None
+        self.document_options = self._document_options()
+        # Resolved once, so the fingerprint matches what stream_encoding() applies
+        ascii85 = self.output_settings.get('ascii85')
+        self.ascii85 = bool(rl_config.useA85) if ascii85 is None else bool(ascii85)
+        self.deterministic = self.output_settings.get('deterministic', False)
+        self.render_fingerprint = self._render_fingerprint()
+        self.cache = PDFCache.from_settings(config_manager, self.render_fingerprint)
+        self.last_render_cached = False
+    
+    def _document_options(self) -> Dict[str, int]:
+        """Canvas/DocTemplate keyword arguments from the output settings"""
+        return {
+            'pageCompression': 1 if self.output_settings.get('page_compression', True) else 0,
+            'invariant': 1 if self.output_settings.get('invariant', False) else 0
+        }
+    
+    def stream_encoding(self):
+        """
+        Context for one document build or save with this generator's output.ascii85
+        Generators with different settings in one process never see each
+        other's value; with the same setting they do not wait for each other.
+        """
+        return _stream_encoding.use(self.ascii85)
     
     def _setup_custom_styles(self):
         self.styles.add(ParagraphStyle(
@@ -52,21 +311,148 @@ class PDFGenerator:
     
     def generate_invoice(self, invoice: Invoice, output_path: Optional[str] = None) -> str:
         if not output_path:
-            filename = self.output_settings['filename_format'].format(
-                invoice_number=invoice.invoice_number,
-                date=invoice.issue_date.strftime('%Y%m%d')
-            )
-            output_path = os.path.join(self.output_settings['folder'], filename)
+            output_path = os.path.join(self.output_settings['folder'], self.output_filename(invoice))
         
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        doc = SimpleDocTemplate(output_path, pagesize=A4, topMargin=0.5*inch)
+        cache_key = self.cache.key(invoice) if self.cache else None
+        self.last_render_cached = bool(cache_key) and self.cache.copy_to(cache_key, output_path)
+        if self.last_render_cached:
+            logger.info(f"Invoice PDF copied from cache: {output_path}")
+            return output_path
+        
+        self._render(invoice, output_path)
+        if cache_key:
+            self._store_in_cache(cache_key, output_path)
+        logger.info(f"Invoice PDF generated: {output_path}")
+        return output_path
+    
+    def output_filename(self, invoice: Invoice) -> str:
+        return self.output_settings['filename_format'].format(
+            invoice_number=invoice.invoice_number,
+            date=invoice.issue_date.strftime('%Y%m%d')
+        )
+    
+    def render_to_bytes(self, invoice: Invoice, store: bool = True) -> bytes:
+        """
+        Render the invoice in memory, without touching the output folder
+        store=False still reads the PDF cache but does not add fresh renders to
+        it (archive runs, whose PDFs already end up in the archive volumes)
+        """
+        cache_key = self.cache.key(invoice) if self.cache else None
+        pdf_bytes = self.cache.get_bytes(cache_key) if cache_key else None
+        self.last_render_cached = pdf_bytes is not None
+        if self.last_render_cached:
+            logger.debug(f"Invoice PDF served from cache: {invoice.invoice_number}")
+            return pdf_bytes
+        
+        buffer = BytesIO()
+        self._render(invoice, buffer)
+        pdf_bytes = buffer.getvalue()
+        if cache_key and store:
+            self._store_in_cache(cache_key, pdf_bytes)
+        logger.debug(f"Invoice PDF rendered in memory: {invoice.invoice_number}")
+        return pdf_bytes
+    
+    def _store_in_cache(self, cache_key: str, pdf: Union[str, bytes]):
+        """Add a fresh render to the cache; a full or read-only cache never fails the render"""
+        try:
+            if isinstance(pdf, bytes):
+                self.cache.put_bytes(cache_key, pdf)
+            else:
+                self.cache.put_file(cache_key, pdf)
+        except OSError as e:
+            logger.warning(f"Could not store invoice PDF in cache: {e}")
+    
+    def _render_fingerprint(self) -> str:
+        """Hash of everything besides the invoice that shapes the rendered PDF"""
+        # The logo by content, not path or mtime, so copies of the setup render identical IDs
+        logo_path = self.company_info.get('logo_path')
+        logo_digest = None
+        if logo_path and os.path.exists(logo_path):
+            with open(logo_path, 'rb') as f:
+                logo_digest = hashlib.sha256(f.read()).hexdigest()
+        
+        settings = {
+            'template_version': TEMPLATE_VERSION,
+            'reportlab': reportlab.Version,
+            'company': {key: value for key, value in self.company_info.items() if key != 'logo_path'},
+            'invoice': self.invoice_settings,
+            'output': dict({key: value for key, value in self.output_settings.items()
+                            if key not in _OUTPUT_LOCATION_SETTINGS}, ascii85=self.ascii85),
+            'logo': logo_digest
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    
+    def generate_print_run(self, invoices: Iterable[Invoice], output_path: str) -> int:
+        """
+        Render many invoices into one PDF for printing: a single document build,
+        each invoice starting on a new page with an outline entry (bookmark).
+        Fonts and the logo image are stored once and shared by every page.
+        Returns the number of invoices.
+        """
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        story = []
+        count = 0
+        identity = DocumentIdentity(self.render_fingerprint) if self.deterministic else None
+        for invoice in invoices:
+            if count:
+                story.append(PageBreak())
+            story.append(InvoiceBookmark(f"invoice-{count}", f"Invoice {invoice.invoice_number}"))
+            story.extend(self._create_story(invoice))
+            if identity:
+                identity.add(invoice)
+            count += 1
+        
+        if not count:
+            raise ValueError("No invoices to render in print run")
+        
+        self._build(self._create_doc(output_path), story, identity)
+        logger.info(f"Print run PDF generated with {count} invoices: {output_path}")
+        return count
+    
+    def _render(self, invoice: Invoice, target: Union[str, BinaryIO]):
+        """Write the invoice PDF to a file path or a binary file object"""
+        identity = None
+        if self.deterministic:
+            identity = DocumentIdentity(self.render_fingerprint)
+            identity.add(invoice)
+        
+        self._build(self._create_doc(target), self._create_story(invoice), identity)
+    
+    def _build(self, doc: BaseDocTemplate, story: List[Flowable], identity: Optional[DocumentIdentity] = None):
+        with self.stream_encoding():
+            if identity:
+                doc.build(story, canvasmaker=identity.canvasmaker())
+            else:
+                doc.build(story)
+    
+    def _create_doc(self, target: Union[str, BinaryIO]) -> BaseDocTemplate:
+        return SimpleDocTemplate(target, pagesize=PAGE_SIZE, topMargin=PAGE_MARGINS['top'],
+                                 **self.document_options)
+    
+    def _create_story(self, invoice: Invoice) -> List[Flowable]:
+        """Flowables of one invoice for the document from _create_doc"""
         story = []
         
         # Company header
         story.extend(self._create_header())
         story.append(Spacer(1, 0.3*inch))
         
+        story.extend(self._create_body(invoice))
+        
+        # Footer
+        story.append(Spacer(1, 0.3*inch))
+        story.extend(self._create_footer())
+        return story
+    
+    def _create_body(self, invoice: Invoice) -> List[Flowable]:
+        """Invoice-specific blocks: title, Bill To, items, totals and notes"""
+        story = []
+        
         # Invoice title and number
         story.extend(self._create_invoice_title(invoice))
         story.append(Spacer(1, 0.2*inch))
@@ -87,22 +473,30 @@ class PDFGenerator:
             story.append(Spacer(1, 0.2*inch))
             story.extend(self._create_notes_section(invoice.notes))
         
-        # Footer
-        story.append(Spacer(1, 0.3*inch))
-        story.extend(self._create_footer())
-        
-        doc.build(story)
-        logger.info(f"Invoice PDF generated: {output_path}")
-        return output_path
+        return story
     
     def _create_header(self):
+        if not self.cache_static:
+            return self._build_header()
+        # Flowables hold per-build layout state, so each document gets shallow copies
+        if self._header_cache is None:
+            self._header_cache = self._build_header()
+        return [copy.copy(element) for element in self._header_cache]
+    
+    def _build_header(self):
         elements = []
         
         # Company logo (if exists)
         logo_path = self.company_info.get('logo_path')
         if logo_path and os.path.exists(logo_path):
             try:
-                logo = Image(logo_path, width=2*inch, height=1*inch)
+                if self.cache_static:
+                    logo = LogoFlowable(load_logo(logo_path,
+                                                  dpi=self.output_settings.get('logo_dpi', LOGO_DPI),
+                                                  jpeg_quality=self.output_settings.get('logo_jpeg_quality')),
+                                        *LOGO_SIZE)
+                else:
+                    logo = Image(logo_path, width=LOGO_SIZE[0], height=LOGO_SIZE[1])
                 elements.append(logo)
             except Exception as e:
                 logger.warning(f"Could not load logo: {e}")
@@ -129,11 +523,22 @@ class PDFGenerator:
         elements.append(title)
         return elements
     
+    # Column widths of the body tables
+    INFO_COL_WIDTHS = [3*inch, 3*inch]
+    ITEMS_COL_WIDTHS = [3.5*inch, 0.8*inch, 1.2*inch, 1.2*inch]
+    TOTALS_COL_WIDTHS = [4.5*inch, 1.5*inch]
+    ITEMS_TABLE_HEADER = ['Description', 'Qty', 'Unit Price', 'Total']
+    
     def _create_info_section(self, invoice: Invoice):
         elements = []
-        
+        table = Table(self._info_section_data(invoice), colWidths=self.INFO_COL_WIDTHS)
+        table.setStyle(INFO_TABLE_STYLE)
+        elements.append(table)
+        return elements
+    
+    def _info_section_data(self, invoice: Invoice) -> List[List[str]]:
         # Create two-column layout for customer and invoice info
-        data = [
+        return [
             ['Bill To:', 'Invoice Details:'],
             [
                 f"{invoice.customer.name}<br/>{invoice.customer.address}<br/>Email: {invoice.customer.email}" + 
@@ -142,53 +547,46 @@ class PDFGenerator:
                 f"Due Date: {invoice.due_date.strftime(self.invoice_settings['date_format'])}"
             ]
         ]
-        
-        table = Table(data, colWidths=[3*inch, 3*inch])
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ]))
-        
-        elements.append(table)
-        return elements
     
     def _create_items_table(self, invoice: Invoice):
         elements = []
-        
+        if self.paged_items:
+            # Laid out page by page, with the header repeated and running subtotals
+            table = PagedItemsTable(invoice.items, self.ITEMS_TABLE_HEADER, self.ITEMS_COL_WIDTHS,
+                                    ITEMS_TABLE_STYLE, self._items_table_row, self._format_amount)
+        else:
+            table = Table(self._items_table_data(invoice), colWidths=self.ITEMS_COL_WIDTHS)
+            table.setStyle(ITEMS_TABLE_STYLE)
+        elements.append(table)
+        return elements
+    
+    def _items_table_data(self, invoice: Invoice) -> List[List[str]]:
         # Table headers
-        data = [['Description', 'Qty', 'Unit Price', 'Total']]
+        data = [list(self.ITEMS_TABLE_HEADER)]
         
         # Add items
-        currency_symbol = self.invoice_settings['currency_symbol']
-        for item in invoice.items:
-            data.append([
-                item.description,
-                str(item.quantity),
-                f"{currency_symbol}{item.unit_price:.2f}",
-                f"{currency_symbol}{item.total:.2f}"
-            ])
-        
-        table = Table(data, colWidths=[3.5*inch, 0.8*inch, 1.2*inch, 1.2*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(table)
-        return elements
+        data.extend(self._items_table_row(item) for item in invoice.items)
+        return data
+    
+    def _items_table_row(self, item: InvoiceItem) -> List[str]:
+        return [
+            item.description,
+            str(item.quantity),
+            self._format_amount(item.unit_price),
+            self._format_amount(item.total)
+        ]
+    
+    def _format_amount(self, amount: Decimal) -> str:
+        return f"{self.invoice_settings['currency_symbol']}{amount:.2f}"
     
     def _create_totals_section(self, invoice: Invoice):
         elements = []
+        totals_table = Table(self._totals_data(invoice), colWidths=self.TOTALS_COL_WIDTHS)
+        totals_table.setStyle(TOTALS_TABLE_STYLE)
+        elements.append(totals_table)
+        return elements
+    
+    def _totals_data(self, invoice: Invoice) -> List[List[str]]:
         currency_symbol = self.invoice_settings['currency_symbol']
         
         totals_data = [
@@ -211,20 +609,7 @@ class PDFGenerator:
             'Total Amount:',
             f"{currency_symbol}{invoice.total_amount:.2f}"
         ])
-        
-        totals_table = Table(totals_data, colWidths=[4.5*inch, 1.5*inch])
-        totals_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('FONTSIZE', (0, -1), (-1, -1), 14),
-            ('TEXTCOLOR', (0, -1), (-1, -1), colors.darkred),
-            ('LINEBELOW', (0, -2), (-1, -2), 1, colors.black),
-            ('LINEBELOW', (0, -1), (-1, -1), 2, colors.black),
-        ]))
-        
-        elements.append(totals_table)
-        return elements
+        return totals_data
     
     def _create_notes_section(self, notes: str):
         elements = []
@@ -234,6 +619,13 @@ class PDFGenerator:
         return elements
     
     def _create_footer(self):
+        if not self.cache_static:
+            return self._build_footer()
+        if self._footer_cache is None:
+            self._footer_cache = self._build_footer()
+        return [copy.copy(element) for element in self._footer_cache]
+    
+    def _build_footer(self):
         elements = []
         footer_text = "Thank you for your business!"
         footer = Paragraph(footer_text, self.styles['CompanyInfo'])
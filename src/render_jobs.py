@@ -0,0 +1,180 @@
+import os
+import queue
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from flask import Blueprint, jsonify, request, url_for
+from .config_manager import ConfigManager
+from .pdf_download import PDFDownloads
+
+logger = logging.getLogger(__name__)
+
+# Renders one job payload and returns the path of the written PDF
+RenderFunction = Callable[[Dict[str, Any]], str]
+
+class RenderJob:
+    """One queued invoice render and its outcome"""
+    
+    def __init__(self, payload: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = 'queued'
+        self.pdf_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'filename': os.path.basename(self.pdf_path) if self.pdf_path else None,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+class RenderJobQueue:
+    """
+    Renders invoice PDFs on a fixed set of background threads
+    Web requests only enqueue a job and poll it by id, so a slow render never
+    holds a request thread. Submitting fails with queue.Full once queue_size
+    jobs are waiting. Finished jobs are forgotten after result_ttl seconds;
+    their PDFs stay in the output folder.
+    """
+    
+    def __init__(self, render: RenderFunction, workers: int = 2, queue_size: int = 100,
+                 result_ttl: float = 3600):
+        self.render = render
+        self.workers = max(1, int(workers))
+        self.result_ttl = float(result_ttl)
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._jobs: 'OrderedDict[str, RenderJob]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+    
+    @classmethod
+    def from_settings(cls, config_manager: ConfigManager, render: RenderFunction) -> 'RenderJobQueue':
+        """Build a job queue from the web.jobs config section"""
+        settings = config_manager.get('web.jobs', {})
+        return cls(
+            render,
+            workers=settings.get('workers', 2),
+            queue_size=settings.get('queue_size', 100),
+            result_ttl=settings.get('result_ttl', 3600)
+        )
+    
+    def submit(self, payload: Dict[str, Any]) -> RenderJob:
+        """Queue a render; raises queue.Full when the backlog is at queue_size"""
+        with self._lock:
+            if not self._threads:
+                self._start()
+            self._expire()
+            job = RenderJob(payload)
+            self._queue.put_nowait(job)
+            self._jobs[job.id] = job
+        logger.debug(f"Render job {job.id} queued")
+        return job
+    
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        with self._lock:
+            self._expire()
+            return self._jobs.get(job_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {'workers': self.workers, 'pending': self._queue.qsize(), **counts}
+    
+    def _start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"render-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        for job_id in [job.id for job in self._jobs.values() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+    
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._run(job)
+            finally:
+                self._queue.task_done()
+    
+    def _run(self, job: RenderJob):
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.pdf_path = self.render(job.payload)
+            job.status = 'done'
+        except Exception as e:
+            logger.error(f"Render job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            # The payload is not needed once rendered
+            job.payload = None
+            job.finished_at = time.time()
+
+def create_jobs_blueprint(jobs: RenderJobQueue, downloads: PDFDownloads) -> Blueprint:
+    """
+    POST /jobs (same JSON body as the synchronous generate route),
+    GET /jobs/<id> for the status and GET /jobs/<id>/pdf for the result
+    """
+    blueprint = Blueprint('render_jobs', __name__)
+    
+    @blueprint.route('/jobs', methods=['POST'])
+    def submit_job():
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({'success': False, 'error': 'Expected a JSON invoice object'}), 400
+        try:
+            job = jobs.submit(payload)
+        except queue.Full:
+            response = jsonify({'success': False, 'error': 'Render queue is full, try again shortly'})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        status_url = url_for('render_jobs.job_status', job_id=job.id)
+        response = jsonify({'success': True, 'job_id': job.id, 'status_url': status_url})
+        response.headers['Location'] = status_url
+        return response, 202
+    
+    @blueprint.route('/jobs/<job_id>')
+    def job_status(job_id):
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Unknown job'}), 404
+        status = job.to_dict()
+        if job.status == 'done':
+            status['pdf_url'] = url_for('render_jobs.job_pdf', job_id=job.id)
+        return jsonify(status)
+    
+    @blueprint.route('/jobs/<job_id>/pdf')
+    def job_pdf(job_id):
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Unknown job'}), 404
+        if job.status != 'done':
+            # Not ready yet (or failed): clients keep polling the status URL
+            return jsonify(job.to_dict()), 409 if job.status == 'failed' else 202
+        if not os.path.exists(job.pdf_path):
+            return jsonify({'success': False, 'error': 'PDF no longer available'}), 410
+        return downloads.send(os.path.dirname(job.pdf_path), os.path.basename(job.pdf_path),
+                              as_attachment=request.args.get('download') == '1')
+    
+    return blueprint
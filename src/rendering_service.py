@@ -0,0 +1,220 @@
+import os
+import threading
+import logging
+from datetime import datetime
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, List, Union
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from .models import Invoice
+from .config_manager import ConfigManager
+from .pdf_generator import PDFGenerator
+
+logger = logging.getLogger(__name__)
+
+# One stylesheet for every quick invoice; the styles are only read while rendering
+STYLES = getSampleStyleSheet()
+
+# Layouts of the single-file Flask front ends (simple_web_app.py and the *_ui_app.py apps)
+THEMES: Dict[str, Dict[str, Any]] = {
+    'simple': {
+        'title': 'INVOICE',
+        'header_background': colors.grey,
+        'body_background': colors.beige,
+        'serial_numbers': False,
+        'customer_fields': [],
+        'currency': 'Rs.',
+        'total_label': 'Total:',
+        'total_font_size': 12,
+        'total_color': None
+    },
+    'best': {
+        'title': 'TAX INVOICE',
+        'header_background': colors.darkblue,
+        'body_background': colors.lightgrey,
+        'serial_numbers': True,
+        'customer_fields': [('customer_email', 'Email')],
+        'currency': 'Rs. ',
+        'total_label': 'Grand Total:',
+        'total_font_size': 14,
+        'total_color': colors.darkred
+    },
+    'modern': {
+        'title': 'TAX INVOICE',
+        'header_background': colors.navy,
+        'body_background': colors.lightgrey,
+        'serial_numbers': True,
+        'customer_fields': [('customer_email', 'Email')],
+        'currency': 'Rs. ',
+        'total_label': 'Grand Total:',
+        'total_font_size': 14,
+        'total_color': colors.darkred
+    },
+    'professional': {
+        'title': 'PROFESSIONAL TAX INVOICE',
+        'header_background': colors.HexColor('#667eea'),
+        'body_background': colors.lightgrey,
+        'serial_numbers': True,
+        'customer_fields': [('customer_email', 'Email'), ('customer_phone', 'Phone'), ('customer_gstin', 'GSTIN')],
+        'currency': 'Rs. ',
+        'total_label': 'Grand Total:',
+        'total_font_size': 14,
+        'total_color': colors.HexColor('#667eea')
+    }
+}
+
+def _items_table_style(theme: Dict[str, Any]) -> TableStyle:
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), theme['header_background']),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), theme['body_background']),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+def _totals_table_style(theme: Dict[str, Any]) -> TableStyle:
+    commands = [
+        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, -1), (-1, -1), theme['total_font_size']),
+    ]
+    if theme['total_color'] is not None:
+        commands.append(('TEXTCOLOR', (0, -1), (-1, -1), theme['total_color']))
+    return TableStyle(commands)
+
+# Table styles built once per theme, (items, totals)
+THEME_TABLE_STYLES = {name: (_items_table_style(theme), _totals_table_style(theme))
+                      for name, theme in THEMES.items()}
+
+class InvoiceRenderingService:
+    """
+    Invoice rendering shared by all Flask front ends
+    Full invoices go through one warm PDFGenerator (logo, static layout and PDF
+    cache stay loaded between requests); the quick themed invoices of the
+    single-file apps reuse the module level stylesheet and table styles.
+    """
+    
+    def __init__(self, config_manager: ConfigManager):
+        self.config_manager = config_manager
+        self.pdf_generator = PDFGenerator(config_manager)
+    
+    def generate_invoice(self, invoice: Invoice) -> str:
+        """Write a full invoice PDF to the configured output folder; returns its path"""
+        return self.pdf_generator.generate_invoice(invoice)
+    
+    def render_invoice(self, invoice: Invoice) -> bytes:
+        """Full invoice PDF in memory"""
+        return self.pdf_generator.render_to_bytes(invoice)
+    
+    def create_themed_pdf(self, data: Dict[str, Any], theme: str, output_folder: str = 'output') -> str:
+        """Write a quick invoice from form data in the given theme; returns the filename"""
+        filename = f"invoice_{data['invoice_number']}_{datetime.now().strftime('%Y%m%d')}.pdf"
+        os.makedirs(output_folder, exist_ok=True)
+        self._render_themed(data, theme, os.path.join(output_folder, filename))
+        return filename
+    
+    def render_themed_pdf(self, data: Dict[str, Any], theme: str) -> bytes:
+        buffer = BytesIO()
+        self._render_themed(data, theme, buffer)
+        return buffer.getvalue()
+    
+    def _render_themed(self, data: Dict[str, Any], theme_name: str, target: Union[str, BinaryIO]):
+        if theme_name not in THEMES:
+            raise ValueError(f"Unknown invoice theme: {theme_name}")
+        theme = THEMES[theme_name]
+        items_style, totals_style = THEME_TABLE_STYLES[theme_name]
+        
+        doc = SimpleDocTemplate(target, pagesize=A4, topMargin=0.5*inch,
+                                **self.pdf_generator.document_options)
+        story = []
+        
+        # Header
+        story.append(Paragraph(theme['title'], STYLES['Title']))
+        story.append(Paragraph(f"Invoice No: {data['invoice_number']}", STYLES['Normal']))
+        story.append(Paragraph(f"Date: {datetime.now().strftime('%d/%m/%Y')}", STYLES['Normal']))
+        story.append(Spacer(1, 0.2*inch))
+        
+        # Customer
+        story.append(Paragraph("Bill To:", STYLES['Heading2']))
+        story.append(Paragraph(data['customer_name'], STYLES['Normal']))
+        story.append(Paragraph(data['customer_address'], STYLES['Normal']))
+        for field, label in theme['customer_fields']:
+            if data.get(field):
+                story.append(Paragraph(f"{label}: {data[field]}", STYLES['Normal']))
+        story.append(Spacer(1, 0.2*inch))
+        
+        # Items table
+        if theme['serial_numbers']:
+            table_data = [['S.No', 'Description', 'Qty', 'Rate (Rs.)', 'GST%', 'Amount (Rs.)']]
+        else:
+            table_data = [['Item', 'Qty', 'Rate', 'GST%', 'Amount']]
+        
+        subtotal = 0
+        total_gst = 0
+        
+        for i, item in enumerate(data['items'], 1):
+            qty = float(item['quantity'])
+            rate = float(item['rate'])
+            gst_rate = float(item['gst_rate'])
+            
+            amount = qty * rate
+            gst_amount = amount * gst_rate / 100
+            
+            subtotal += amount
+            total_gst += gst_amount
+            table_data.append(self._item_row(theme, i, item['description'], qty, rate, gst_rate,
+                                             amount + gst_amount))
+        
+        table = Table(table_data)
+        table.setStyle(items_style)
+        story.append(table)
+        story.append(Spacer(1, 0.2*inch))
+        
+        # Totals
+        discount_rate = float(data.get('discount_rate', 0))
+        discount_amount = subtotal * discount_rate / 100
+        grand_total = subtotal + total_gst - discount_amount
+        
+        currency = theme['currency']
+        totals_table = Table([
+            ['Subtotal:', f"{currency}{subtotal:.2f}"],
+            ['GST:', f"{currency}{total_gst:.2f}"],
+            ['Discount:', f"{currency}{discount_amount:.2f}"],
+            [theme['total_label'], f"{currency}{grand_total:.2f}"]
+        ], colWidths=[3*inch, 1.5*inch])
+        totals_table.setStyle(totals_style)
+        story.append(totals_table)
+        
+        if data.get('notes'):
+            story.append(Spacer(1, 0.2*inch))
+            story.append(Paragraph(f"Notes: {data['notes']}", STYLES['Normal']))
+        
+        with self.pdf_generator.stream_encoding():
+            doc.build(story)
+        logger.debug(f"Themed invoice rendered ({theme_name}): {data['invoice_number']}")
+    
+    @staticmethod
+    def _item_row(theme: Dict[str, Any], index: int, description: str, qty: float, rate: float,
+                  gst_rate: float, total_amount: float) -> List[str]:
+        if theme['serial_numbers']:
+            return [str(index), description, f"{qty:.1f}", f"{rate:.2f}", f"{gst_rate:.0f}%", f"{total_amount:.2f}"]
+        return [description, str(qty), f"Rs.{rate:.2f}", f"{gst_rate}%", f"Rs.{total_amount:.2f}"]
+
+_services: Dict[str, InvoiceRenderingService] = {}
+_services_lock = threading.Lock()
+
+def get_rendering_service(config_path: str = 'config/settings.json') -> InvoiceRenderingService:
+    """The process-wide rendering service for a settings file, created on first use"""
+    key = os.path.abspath(config_path)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = InvoiceRenderingService(ConfigManager(config_path))
+            logger.info(f"Invoice rendering service started with {config_path}")
+        return service
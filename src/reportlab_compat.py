@@ -0,0 +1,66 @@
+"""
+ReportLab internals used for shared logo images and deterministic documents
+ReportLab has no public API to pre-register an encoded image or to set a
+document's creation date and /ID, so these helpers reach into private
+attributes, but only on the versions they were checked against (the range
+pinned in requirements.txt). On any other version INTERNALS_SUPPORTED is
+False and callers take the public path: drawImage encodes the logo itself
+and deterministic documents use ReportLab's invariant mode.
+"""
+
+import re
+import copy
+import logging
+from typing import Optional
+import reportlab
+from reportlab.lib.utils import ImageReader, TimeStamp
+from reportlab.pdfbase.pdfdoc import PDFImageXObject, PDFText, DummyDoc
+from reportlab.pdfgen.canvas import Canvas
+
+try:
+    from reportlab.pdfgen.canvas import _digester
+except ImportError:
+    _digester = None
+
+logger = logging.getLogger(__name__)
+
+# (major, minor) releases whose internals these helpers were checked against
+CHECKED_VERSIONS = ((4, 0), (5, 0))
+
+def _release(version: str) -> tuple:
+    return tuple(int(part) for part in re.findall(r'\d+', version)[:2])
+
+INTERNALS_SUPPORTED = (_release(reportlab.Version) in CHECKED_VERSIONS
+                       and _digester is not None
+                       and hasattr(Canvas, '_setXObjects'))
+
+if not INTERNALS_SUPPORTED:
+    logger.info(f"ReportLab {reportlab.Version} not checked for shared logos and pinned "
+                f"document IDs; using drawImage and invariant mode")
+
+def image_xobject(reader: ImageReader) -> Optional[PDFImageXObject]:
+    """Encoded image XObject under the name drawImage derives; None if unsupported or masked"""
+    if not INTERNALS_SUPPORTED or reader._dataA:
+        return None
+    name = _digester(reader.getRGBData() + b'auto')
+    xobject = PDFImageXObject(name, reader, mask='auto')
+    xobject.name = name
+    return xobject
+
+def register_xobject(canv: Canvas, prototype: PDFImageXObject):
+    """Add a copy of an image_xobject() to a canvas' document, once per document"""
+    doc = canv._doc
+    reg_name = doc.getXObjectName(prototype.name)
+    if reg_name not in doc.idToObject:
+        xobject = copy.copy(prototype)
+        canv._setXObjects(xobject)
+        doc.Reference(xobject, reg_name)
+        doc.addForm(prototype.name, xobject)
+
+def pin_identity(canv: Canvas, timestamp: TimeStamp, digest: bytes):
+    """Set a canvas' creation date and file /ID in place of the time-seeded ones"""
+    doc = canv._doc
+    doc._timeStamp = timestamp
+    # Same layout as PDFDocument.ID(): the permanent and changing IDs are equal
+    file_id = PDFText(digest, enc='raw').format(DummyDoc())
+    doc._ID = b'\n[' + file_id + file_id + b']\n% ReportLab generated PDF document -- digest (opensource)\n'
@@ -0,0 +1,142 @@
+import re
+import gzip
+import hashlib
+import logging
+from typing import Dict, Iterable, List
+from flask import Flask, current_app, render_template, request
+from .config_manager import ConfigManager
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Blocks whose content is minified by its own rules (or, for pre/textarea, left alone)
+_RAW_BLOCK = re.compile(r'(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)', re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+# Preferred content codings, best first
+ENCODINGS = ('br', 'gzip')
+
+def _minify_text(html: str) -> str:
+    html = _HTML_COMMENT.sub('', html)
+    html = re.sub(r'\s*\n\s*', '\n', html)
+    return re.sub(r'[ \t]{2,}', ' ', html)
+
+def _minify_css(css: str) -> str:
+    css = _CSS_COMMENT.sub('', css)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def _minify_js(js: str) -> str:
+    # Line by line only: keeping the line breaks keeps automatic semicolon insertion intact
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def minify_html(html: str) -> str:
+    """
+    Conservative minification of a page with inline CSS and JS
+    Comments and indentation go, CSS is collapsed, scripts lose only blank,
+    comment and leading whitespace per line; pre and textarea are untouched.
+    """
+    parts: List[str] = []
+    position = 0
+    for match in _RAW_BLOCK.finditer(html):
+        parts.append(_minify_text(html[position:match.start()]))
+        opening, tag, content, closing = match.groups()
+        tag = tag.lower()
+        if tag == 'style':
+            content = _minify_css(content)
+        elif tag == 'script':
+            content = _minify_js(content)
+        parts.append(opening + content + closing)
+        position = match.end()
+    parts.append(_minify_text(html[position:]))
+    return ''.join(parts).strip()
+
+class StaticPage:
+    """One rendered page with its precompressed variants"""
+    
+    def __init__(self, body: bytes, use_brotli: bool = True):
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.variants: Dict[str, bytes] = {'identity': body}
+        # mtime=0 keeps the gzip bytes identical across restarts
+        gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(gzipped) < len(body):
+            self.variants['gzip'] = gzipped
+        if use_brotli and brotli is not None:
+            compressed = brotli.compress(body, mode=brotli.MODE_TEXT, quality=11)
+            if len(compressed) < len(body):
+                self.variants['br'] = compressed
+    
+    def variant_etag(self, encoding: str) -> str:
+        # Each coding is a different representation, so it gets its own validator
+        return self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+    
+    def sizes(self) -> Dict[str, int]:
+        return {encoding: len(body) for encoding, body in self.variants.items()}
+
+class StaticPages:
+    """
+    Template pages rendered, minified and compressed once at startup
+    The templates have no per-request content, so each page is served straight
+    from memory: brotli or gzip by Accept-Encoding, with an ETag (304 on
+    revalidation) and a Cache-Control max-age.
+    """
+    
+    def __init__(self, minify: bool = True, max_age: int = 3600, use_brotli: bool = True):
+        self.minify = minify
+        self.max_age = int(max_age)
+        self.use_brotli = use_brotli
+        self.pages: Dict[str, StaticPage] = {}
+    
+    @classmethod
+    def from_settings(cls, config_manager: ConfigManager) -> 'StaticPages':
+        """Build from the web.static config section"""
+        settings = config_manager.get('web.static', {})
+        return cls(
+            minify=settings.get('minify', True),
+            max_age=settings.get('max_age', 3600),
+            use_brotli=settings.get('brotli', True)
+        )
+    
+    def load(self, app: Flask, template_names: Iterable[str]):
+        """Render each template once (through Jinja, as render_template would) and precompress it"""
+        with app.test_request_context():
+            for name in template_names:
+                html = render_template(name)
+                original_size = len(html.encode('utf-8'))
+                if self.minify:
+                    html = minify_html(html)
+                page = StaticPage(html.encode('utf-8'), use_brotli=self.use_brotli)
+                self.pages[name] = page
+                logger.info(f"Static page {name}: {original_size} bytes, served as {page.sizes()}")
+    
+    def response(self, name: str):
+        """Response for a loaded page, negotiated against the current request"""
+        page = self.pages[name]
+        encoding = self._negotiate(page)
+        body = page.variants[encoding]
+        
+        response = current_app.response_class(body, mimetype='text/html')
+        response.set_etag(page.variant_etag(encoding))
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.vary.add('Accept-Encoding')
+        if encoding != 'identity':
+            response.content_encoding = encoding
+        
+        return response.make_conditional(request)
+    
+    @staticmethod
+    def _negotiate(page: StaticPage) -> str:
+        accepted = request.accept_encodings
+        for encoding in ENCODINGS:
+            if encoding in page.variants and accepted.quality(encoding) > 0:
+                return encoding
+        return 'identity'
@@ -0,0 +1,50 @@
+import os
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.run import write_config, iter_invoices
+from benchmarks.standins import SQLiteDatabaseManager, LocalSMTPServer
+from benchmarks.synthetic import generate_billing_rows, date_range
+from src.config_manager import ConfigManager
+from src.invoice_generator import InvoiceGenerator
+
+@pytest.fixture
+def make_config(tmp_path):
+    """settings.json copy pointed at tmp_path, with per-test overrides"""
+    def make(overrides=None, smtp_port=0):
+        return write_config(str(tmp_path), smtp_port, overrides)
+    return make
+
+@pytest.fixture
+def invoices():
+    return list(iter_invoices({'customers': 3, 'records': 6, 'items': 4}))
+
+@pytest.fixture
+def smtp():
+    with LocalSMTPServer() as server:
+        yield server
+
+@pytest.fixture
+def billing_rows():
+    return list(generate_billing_rows(3, 10, 2))
+
+@pytest.fixture
+def run_dates():
+    return date_range(10)
+
+@pytest.fixture
+def make_generator():
+    """InvoiceGenerator on an SQLite stand-in; pass db to share a database between runs"""
+    def make(config_path, rows=(), db=None):
+        generator = InvoiceGenerator(config_path)
+        generator.db_manager = db or SQLiteDatabaseManager(generator.config_manager, rows)
+        return generator
+    return make
+
+@pytest.fixture
+def config_manager(make_config):
+    return ConfigManager(make_config())
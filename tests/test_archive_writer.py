@@ -0,0 +1,65 @@
+import csv
+import os
+import zipfile
+import pytest
+from src.archive_writer import ArchiveWriter
+
+PDF = b'%PDF-1.4\n' + b'x' * 4000
+
+def manifest_rows(writer):
+    with open(writer.manifest_path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+@pytest.mark.parametrize('archive_format', ['zip', 'tar'])
+def test_volumes_roll_over_at_max_size(tmp_path, invoices, archive_format):
+    closed = []
+    writer = ArchiveWriter(str(tmp_path), 'run', archive_format, max_volume_bytes=10000,
+                           on_volume_closed=closed.append)
+    locations = [writer.add(invoice, f"{invoice.invoice_number}.pdf", PDF) for invoice in invoices[:5]]
+    writer.close()
+    
+    assert len(writer.volume_paths) == 3
+    assert closed == writer.volume_paths
+    assert all(os.path.getsize(path) <= 10000 + 1024 for path in writer.volume_paths)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.partial')]
+    for location in locations:
+        assert ArchiveWriter.read_member(location) == PDF
+    
+    rows = manifest_rows(writer)
+    assert [row['invoice_number'] for row in rows] == [invoice.invoice_number for invoice in invoices[:5]]
+    assert {row['volume'] for row in rows} == {os.path.basename(path) for path in writer.volume_paths}
+
+def test_open_volume_is_partial_until_closed(tmp_path, invoices):
+    closed = []
+    writer = ArchiveWriter(str(tmp_path), 'run', max_volume_bytes=10000, on_volume_closed=closed.append)
+    writer.add(invoices[0], 'a.pdf', PDF)
+    
+    assert sorted(os.listdir(tmp_path)) == ['invoices_run_001.zip.partial', 'invoices_run_manifest.csv']
+    assert closed == []
+    assert manifest_rows(writer) == []
+    
+    writer.close()
+    writer.close()
+    assert closed == [str(tmp_path / 'invoices_run_001.zip')]
+    assert len(manifest_rows(writer)) == 1
+
+def test_resumed_run_continues_numbering_and_drops_partial(tmp_path, invoices):
+    first = ArchiveWriter(str(tmp_path), 'run', max_volume_bytes=10000)
+    first.add(invoices[0], 'a.pdf', PDF)
+    first.close()
+    # An interrupted attempt leaves an unfinished volume behind
+    (tmp_path / 'invoices_run_002.zip.partial').write_bytes(b'PK')
+    
+    resumed = ArchiveWriter(str(tmp_path), 'run', max_volume_bytes=10000)
+    resumed.add(invoices[1], 'b.pdf', PDF)
+    resumed.close()
+    
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith('.zip')) == \
+        ['invoices_run_001.zip', 'invoices_run_002.zip']
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.partial')]
+    assert [row['member'] for row in manifest_rows(resumed)] == ['a.pdf', 'b.pdf']
+    assert zipfile.ZipFile(tmp_path / 'invoices_run_002.zip').namelist() == ['b.pdf']
+
+def test_read_member_rejects_plain_paths():
+    with pytest.raises(KeyError):
+        ArchiveWriter.read_member('output/invoice.pdf')
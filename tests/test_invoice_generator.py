@@ -0,0 +1,145 @@
+import os
+import time
+import pytest
+from src.archive_writer import ArchiveWriter
+
+RUN_KEY = '20240101-20240111'
+
+def saved_numbers(db):
+    return {row[0] for row in db._sqlite.execute("SELECT invoice_number FROM invoice_metadata")}
+
+def forget_invoices(db, count):
+    """Drop the last `count` metadata rows, as if the run had stopped before saving them"""
+    db._sqlite.execute("DELETE FROM invoice_metadata WHERE invoice_number IN (SELECT invoice_number "
+                       "FROM invoice_metadata ORDER BY invoice_number DESC LIMIT ?)", (count,))
+    db._sqlite.commit()
+
+def fail_saves(db, failures):
+    """Make the next `failures` metadata batch writes raise"""
+    save = db.save_invoice_metadata_many
+    remaining = [failures]
+    
+    def flaky(rows, checkpoint=None):
+        if remaining[0]:
+            remaining[0] -= 1
+            raise OSError('database unavailable')
+        return save(rows, checkpoint)
+    
+    db.save_invoice_metadata_many = flaky
+
+def wait_for_messages(smtp, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while smtp.messages < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return smtp.messages
+
+def test_batch_records_every_invoice(make_config, make_generator, billing_rows, run_dates):
+    generator = make_generator(make_config(), billing_rows)
+    successful, errors = generator.generate_invoices(*run_dates)
+    assert errors == []
+    assert len(successful) == 10
+    assert all(os.path.exists(path) for path in successful)
+    assert len(saved_numbers(generator.db_manager)) == 10
+
+def test_resume_regenerates_only_unrecorded_invoices(make_config, make_generator, billing_rows, run_dates):
+    config = make_config({'processing': {'checkpoints': True}})
+    first = make_generator(config, billing_rows)
+    first.generate_invoices(*run_dates)
+    db = first.db_manager
+    forget_invoices(db, 4)
+    db.save_run_checkpoint({'run_key': RUN_KEY, 'invoices_done': 6,
+                            'last_invoice_number': sorted(saved_numbers(db))[-1], 'status': 'running'})
+    
+    resumed = make_generator(config, db=db)
+    successful, errors = resumed.generate_invoices(*run_dates, resume=True)
+    assert errors == []
+    assert len(successful) == 4
+    assert resumed.skipped_count == 6
+    assert len(saved_numbers(db)) == 10
+    
+    db.connect()
+    checkpoint = db.get_run_checkpoint(RUN_KEY)
+    assert checkpoint['invoices_done'] == 10
+    assert checkpoint['status'] == 'complete'
+
+def test_resume_with_nothing_left_keeps_checkpoint(make_config, make_generator, billing_rows, run_dates):
+    config = make_config({'processing': {'checkpoints': True}})
+    first = make_generator(config, billing_rows)
+    first.generate_invoices(*run_dates)
+    db = first.db_manager
+    db.connect()
+    recorded = db.get_run_checkpoint(RUN_KEY)
+    
+    resumed = make_generator(config, db=db)
+    successful, errors = resumed.generate_invoices(*run_dates, resume=True)
+    assert (successful, errors) == ([], [])
+    assert resumed.skipped_count == 10
+    
+    db.connect()
+    checkpoint = db.get_run_checkpoint(RUN_KEY)
+    assert checkpoint['invoices_done'] == recorded['invoices_done'] == 10
+    assert checkpoint['last_invoice_number'] == recorded['last_invoice_number']
+
+def test_resume_without_earlier_checkpoint_writes_none(make_config, make_generator, billing_rows, run_dates):
+    config = make_config()
+    first = make_generator(config, billing_rows)
+    first.generate_invoices(*run_dates)
+    
+    resumed = make_generator(config, db=first.db_manager)
+    resumed.generate_invoices(*run_dates, resume=True)
+    first.db_manager.connect()
+    assert first.db_manager.get_run_checkpoint(RUN_KEY) is None
+
+def test_flush_failure_is_retried(make_config, make_generator, billing_rows, run_dates):
+    config = make_config({'database': {'metadata_flush_size': 3, 'metadata_flush_interval': 0}})
+    generator = make_generator(config, billing_rows)
+    fail_saves(generator.db_manager, 2)
+    successful, errors = generator.generate_invoices(*run_dates)
+    assert errors == []
+    assert len(successful) == 10
+    assert len(saved_numbers(generator.db_manager)) == 10
+
+def test_unsaved_invoices_are_not_successful(make_config, make_generator, billing_rows, run_dates):
+    generator = make_generator(make_config(), billing_rows)
+    fail_saves(generator.db_manager, 1000)
+    successful, errors = generator.generate_invoices(*run_dates)
+    assert successful == []
+    assert any('Failed to save metadata for 10 invoices' in error for error in errors)
+
+@pytest.mark.parametrize('archive', [None, 'zip'])
+def test_emails_wait_for_saved_metadata(make_config, make_generator, billing_rows, run_dates, smtp, archive):
+    config = make_config({'database': {'metadata_flush_size': 3, 'metadata_flush_interval': 60}},
+                         smtp_port=smtp.port)
+    generator = make_generator(config, billing_rows)
+    successful, errors = generator.generate_invoices(*run_dates, send_email=True, archive=archive)
+    assert len(successful) == 10
+    assert generator.email_report['sent_count'] == 10
+    assert wait_for_messages(smtp, 10) == 10
+
+@pytest.mark.parametrize('archive', [None, 'zip'])
+def test_no_email_when_metadata_is_not_saved(make_config, make_generator, billing_rows, run_dates, smtp,
+                                             archive):
+    generator = make_generator(make_config(smtp_port=smtp.port), billing_rows)
+    fail_saves(generator.db_manager, 1000)
+    successful, errors = generator.generate_invoices(*run_dates, send_email=True, archive=archive)
+    assert successful == []
+    assert generator.email_report['sent_count'] == 0
+    assert smtp.messages == 0
+
+def test_unfinished_archive_volume_is_not_successful(make_config, make_generator, billing_rows, run_dates,
+                                                     monkeypatch):
+    def close_volume(writer):
+        if len(writer.volume_paths) > 1:
+            raise OSError('disk full')
+        original_close_volume(writer)
+    
+    original_close_volume = ArchiveWriter._close_volume
+    monkeypatch.setattr(ArchiveWriter, '_close_volume', close_volume)
+    config = make_config({'archive': {'max_volume_mb': 0.02}})
+    generator = make_generator(config, billing_rows)
+    successful, errors = generator.generate_invoices(*run_dates, archive='zip')
+    
+    saved = {row[0] for row in generator.db_manager._sqlite.execute("SELECT pdf_path FROM invoice_metadata")}
+    assert 0 < len(successful) < 10
+    assert set(successful) == saved
+    assert any('their archive volume was not completed' in error for error in errors)
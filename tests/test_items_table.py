@@ -0,0 +1,46 @@
+from decimal import Decimal
+from reportlab.platypus import Table
+from src.items_table import PagedItemsTable
+from src.models import InvoiceItem
+from src.pdf_generator import ITEMS_TABLE_STYLE, PDFGenerator
+
+def make_table(items):
+    return PagedItemsTable(items, PDFGenerator.ITEMS_TABLE_HEADER, PDFGenerator.ITEMS_COL_WIDTHS,
+                           ITEMS_TABLE_STYLE, lambda item: [item.description, str(item.quantity),
+                                                            f"{item.unit_price:.2f}", f"{item.total:.2f}"],
+                           lambda amount: f"{amount:.2f}")
+
+def split_pages(table, height):
+    """Split page by page; returns the Table drawn on each page and the continuation of each split"""
+    pages, continuations = [], []
+    while True:
+        table.wrap(table.width, height)
+        parts = table.split(table.width, height)
+        pages.append(parts[0])
+        if len(parts) == 1:
+            return pages, continuations
+        table = parts[1]
+        continuations.append(table)
+
+def test_split_carries_running_subtotals():
+    items = [InvoiceItem(description=f"Item {n}", quantity=n, unit_price=Decimal('10.50'))
+             for n in range(1, 41)]
+    pages, continuations = split_pages(make_table(items), 200)
+    
+    assert len(pages) > 2
+    assert all(isinstance(page, Table) for page in pages)
+    for continuation in continuations:
+        expected = sum((item.total for item in items[:continuation.start]), Decimal('0'))
+        assert continuation.brought_forward == expected
+    
+    rows = [row for page in pages for row in page._cellvalues]
+    assert [row[0] for row in rows if row[0].startswith('Item ')] == [item.description for item in items]
+    carried = [row[-1] for row in rows if row[0] == 'Carried forward:']
+    brought = [row[-1] for row in rows if row[0] == 'Brought forward:']
+    assert carried == brought == [f"{c.brought_forward:.2f}" for c in continuations]
+
+def test_items_that_fit_are_one_table():
+    items = [InvoiceItem(description='Only item', quantity=2, unit_price=Decimal('5'))]
+    pages, continuations = split_pages(make_table(items), 500)
+    assert len(pages) == 1 and continuations == []
+    assert [row[0] for row in pages[0]._cellvalues] == [PDFGenerator.ITEMS_TABLE_HEADER[0], 'Only item']
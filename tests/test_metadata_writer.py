@@ -0,0 +1,96 @@
+import pytest
+from benchmarks.standins import SQLiteDatabaseManager
+from src.database import MetadataFlushError
+
+class FlakyDatabase(SQLiteDatabaseManager):
+    """Fails the first `failures` batch writes"""
+    
+    def __init__(self, config_manager, failures):
+        super().__init__(config_manager)
+        self.failures = failures
+        self.connect()
+    
+    def save_invoice_metadata_many(self, rows, checkpoint=None):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('database unavailable')
+        return super().save_invoice_metadata_many(rows, checkpoint)
+    
+    def saved_numbers(self):
+        return [row[0] for row in self._sqlite.execute(
+            "SELECT invoice_number FROM invoice_metadata ORDER BY invoice_number")]
+
+def test_failed_flush_keeps_rows_for_retry(config_manager, invoices):
+    db = FlakyDatabase(config_manager, failures=1)
+    writer = db.metadata_writer(flush_size=100, flush_interval=60)
+    for invoice in invoices[:3]:
+        writer.add(invoice, f"{invoice.invoice_number}.pdf")
+    
+    with pytest.raises(MetadataFlushError) as raised:
+        writer.flush()
+    assert raised.value.invoice_numbers == [invoice.invoice_number for invoice in invoices[:3]]
+    assert writer.pending == 3
+    assert writer.written == 0
+    
+    assert writer.flush() == 3
+    assert writer.pending == 0
+    assert db.saved_numbers() == sorted(invoice.invoice_number for invoice in invoices[:3])
+
+def test_automatic_flush_failure_waits_for_interval(config_manager, invoices):
+    db = FlakyDatabase(config_manager, failures=1)
+    writer = db.metadata_writer(flush_size=2, flush_interval=60)
+    for invoice in invoices[:4]:
+        writer.add(invoice, f"{invoice.invoice_number}.pdf")
+    
+    # The size-triggered flush failed once; later rows do not retry before the interval
+    assert writer.pending == 4
+    assert db.failures == 0
+    assert writer.flush() == 4
+
+def test_on_flushed_reports_only_saved_rows(config_manager, invoices):
+    db = FlakyDatabase(config_manager, failures=1)
+    writer = db.metadata_writer(flush_size=100, flush_interval=60)
+    flushed = []
+    writer.on_flushed = lambda rows: flushed.extend(row['invoice_number'] for row in rows)
+    writer.add(invoices[0], 'a.pdf')
+    
+    with pytest.raises(MetadataFlushError):
+        writer.flush()
+    assert flushed == []
+    writer.flush()
+    assert flushed == [invoices[0].invoice_number]
+
+def test_held_rows_wait_for_release(config_manager, invoices):
+    db = FlakyDatabase(config_manager, failures=0)
+    writer = db.metadata_writer(flush_size=1, flush_interval=60)
+    writer.hold(invoices[0], 'volume_001.zip#a.pdf')
+    writer.hold(invoices[1], 'volume_001.zip#b.pdf')
+    assert writer.flush() == 0
+    assert writer.held == 2
+    
+    writer.release()
+    assert writer.held == 0
+    assert writer.written == 2
+
+def test_discard_held_drops_unreleased_rows(config_manager, invoices):
+    db = FlakyDatabase(config_manager, failures=0)
+    writer = db.metadata_writer()
+    writer.hold(invoices[0], 'volume_001.zip#a.pdf')
+    
+    discarded = writer.discard_held()
+    assert [row['pdf_path'] for row in discarded] == ['volume_001.zip#a.pdf']
+    assert writer.held == 0
+    assert writer.flush() == 0
+    assert db.saved_numbers() == []
+
+def test_flush_moves_run_checkpoint(config_manager, invoices):
+    db = FlakyDatabase(config_manager, failures=0)
+    writer = db.metadata_writer(flush_size=100, flush_interval=60, run_key='run', invoices_done=5)
+    for invoice in invoices[:2]:
+        writer.add(invoice, f"{invoice.invoice_number}.pdf")
+    writer.flush()
+    
+    checkpoint = db.get_run_checkpoint('run')
+    assert checkpoint['invoices_done'] == 7
+    assert checkpoint['last_invoice_number'] == invoices[1].invoice_number
+    assert checkpoint['status'] == 'running'
@@ -0,0 +1,36 @@
+import os
+from src.pdf_cache import PDFCache
+
+def test_evicts_least_recently_used_over_max_bytes(tmp_path):
+    cache = PDFCache(str(tmp_path), max_bytes=250)
+    for key in ('aa01', 'bb02', 'cc03'):
+        cache.put_bytes(key, b'x' * 100)
+    
+    # Two fit; the oldest entry went to make room for the third
+    assert cache.get_bytes('aa01') is None
+    assert cache.stats()['bytes'] == 200
+    
+    cache.get_bytes('bb02')
+    cache.put_bytes('dd04', b'y' * 100)
+    assert cache.get_bytes('bb02') == b'x' * 100
+    assert cache.get_bytes('cc03') is None
+    assert not os.path.exists(cache.path('cc03'))
+
+def test_index_survives_restart(tmp_path):
+    cache = PDFCache(str(tmp_path), max_bytes=1000)
+    cache.put_bytes('aa01', b'x' * 100)
+    cache.put_bytes('bb02', b'x' * 100)
+    
+    reopened = PDFCache(str(tmp_path), max_bytes=150)
+    assert reopened.stats()['entries'] == 1
+    assert reopened.stats()['bytes'] <= 150
+
+def test_key_depends_on_invoice_and_fingerprint(tmp_path, invoices):
+    cache = PDFCache(str(tmp_path), max_bytes=1000, fingerprint='settings-a')
+    other = PDFCache(str(tmp_path), max_bytes=1000, fingerprint='settings-b')
+    assert cache.key(invoices[0]) == cache.key(invoices[0].model_copy())
+    assert cache.key(invoices[0]) != cache.key(invoices[1])
+    assert cache.key(invoices[0]) != other.key(invoices[0])
+
+def test_disabled_by_default(config_manager):
+    assert PDFCache.from_settings(config_manager) is None
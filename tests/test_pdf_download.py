@@ -0,0 +1,58 @@
+import hashlib
+import pytest
+from flask import Flask
+from src.pdf_download import PDFDownloads
+
+CONTENT = b'%PDF-1.4\n' + bytes(range(256)) * 8
+
+def make_client(folder, **options):
+    app = Flask(__name__)
+    downloads = PDFDownloads(**options)
+    
+    @app.route('/download/<filename>')
+    def download(filename):
+        return downloads.send(str(folder), filename)
+    
+    return app.test_client()
+
+@pytest.fixture
+def pdf_folder(tmp_path):
+    (tmp_path / 'invoice.pdf').write_bytes(CONTENT)
+    return tmp_path
+
+def test_etag_is_content_hash_and_revalidates(pdf_folder):
+    client = make_client(pdf_folder)
+    response = client.get('/download/invoice.pdf')
+    etag = hashlib.sha256(CONTENT).hexdigest()
+    assert response.status_code == 200
+    assert response.data == CONTENT
+    assert response.headers['ETag'] == f'"{etag}"'
+    
+    revalidated = client.get('/download/invoice.pdf', headers={'If-None-Match': f'"{etag}"'})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+
+def test_range_request_returns_partial_content(pdf_folder):
+    client = make_client(pdf_folder)
+    response = client.get('/download/invoice.pdf', headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.data == CONTENT[100:200]
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(CONTENT)}'
+
+def test_changed_file_gets_new_etag(pdf_folder):
+    client = make_client(pdf_folder)
+    first = client.get('/download/invoice.pdf').headers['ETag']
+    (pdf_folder / 'invoice.pdf').write_bytes(CONTENT + b'%%EOF')
+    assert client.get('/download/invoice.pdf').headers['ETag'] != first
+
+def test_missing_and_escaping_names_are_404(pdf_folder):
+    client = make_client(pdf_folder)
+    assert client.get('/download/other.pdf').status_code == 404
+    assert client.get('/download/..%2Fsecret.pdf').status_code == 404
+
+def test_accel_redirect_hands_file_to_front_server(pdf_folder):
+    client = make_client(pdf_folder, accel_redirect_prefix='/protected-pdfs/')
+    response = client.get('/download/invoice.pdf')
+    assert response.headers['X-Accel-Redirect'] == '/protected-pdfs/invoice.pdf'
+    assert 'X-Sendfile' not in response.headers
+    assert response.data == b''
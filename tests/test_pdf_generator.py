@@ -0,0 +1,83 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src import reportlab_compat
+from src.config_manager import ConfigManager
+from src.pdf_generator import PDFGenerator, _stream_encoding
+
+def creation_date(pdf: bytes) -> bytes:
+    return re.search(rb'/CreationDate \(D:(\d{8})', pdf).group(1)
+
+@pytest.fixture
+def make_pdf_generator(make_config):
+    def make(**output):
+        return PDFGenerator(ConfigManager(make_config({'output': output})))
+    return make
+
+def test_deterministic_output_is_byte_identical(make_pdf_generator, invoices):
+    first = make_pdf_generator(deterministic=True).render_to_bytes(invoices[0])
+    second = make_pdf_generator(deterministic=True).render_to_bytes(invoices[0])
+    assert first == second
+    assert creation_date(first) == invoices[0].issue_date.strftime('%Y%m%d').encode()
+    assert make_pdf_generator(deterministic=True).render_to_bytes(invoices[1]) != first
+
+def test_deterministic_without_reportlab_internals(make_pdf_generator, invoices, monkeypatch):
+    monkeypatch.setattr(reportlab_compat, 'INTERNALS_SUPPORTED', False)
+    first = make_pdf_generator(deterministic=True).render_to_bytes(invoices[0])
+    second = make_pdf_generator(deterministic=True).render_to_bytes(invoices[0])
+    assert first == second
+    # ReportLab's invariant mode fixes the date instead
+    assert creation_date(first) == b'20000101'
+    assert b'/Subtype /Image' in first
+
+def test_logo_is_drawn_without_reportlab_internals(make_pdf_generator, invoices, monkeypatch):
+    shared = make_pdf_generator().render_to_bytes(invoices[0])
+    monkeypatch.setattr(reportlab_compat, 'INTERNALS_SUPPORTED', False)
+    fallback = make_pdf_generator().render_to_bytes(invoices[0])
+    assert shared.count(b'/Subtype /Image') == fallback.count(b'/Subtype /Image') == 1
+
+def test_generators_keep_their_own_ascii85_setting_concurrently(make_pdf_generator, invoices):
+    encoded = make_pdf_generator(deterministic=True, ascii85=True)
+    binary = make_pdf_generator(deterministic=True, ascii85=False)
+    expected = {True: encoded.render_to_bytes(invoices[0]), False: binary.render_to_bytes(invoices[0])}
+    assert b'/ASCII85Decode' in expected[True]
+    assert b'/ASCII85Decode' not in expected[False]
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        jobs = [(generator.ascii85, pool.submit(generator.render_to_bytes, invoices[0]))
+                for _ in range(6) for generator in (encoded, binary)]
+        for ascii85, job in jobs:
+            assert job.result() == expected[ascii85]
+
+def test_stream_encoding_waits_only_for_a_different_setting():
+    entered = []
+    release = threading.Event()
+    
+    def build(ascii85, name):
+        with _stream_encoding.use(ascii85):
+            entered.append(name)
+            release.wait(5)
+    
+    def wait_for(name):
+        deadline = time.monotonic() + 5
+        while name not in entered and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return name in entered
+    
+    threads = [threading.Thread(target=build, args=args)
+               for args in ((True, 'first'), (True, 'same'), (False, 'other'))]
+    threads[0].start()
+    assert wait_for('first')
+    threads[1].start()
+    threads[2].start()
+    try:
+        assert wait_for('same')
+        time.sleep(0.1)
+        assert 'other' not in entered
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert entered == ['first', 'same', 'other']
@@ -3,10 +3,11 @@
 Web-based Invoice Generator with Modern UI
 """
 
-from flask import Flask, render_template, request, send_file, jsonify
+from flask import Flask, Response, request, send_file, jsonify, stream_with_context
+from io import BytesIO
 import os
 import sys
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 import json
 
@@ -14,18 +15,34 @@ import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.models import Invoice, Customer, InvoiceItem
-from src.pdf_generator import PDFGenerator
-from src.config_manager import ConfigManager
+from src.rendering_service import get_rendering_service
+from src.render_jobs import RenderJobQueue, create_jobs_blueprint
+from src.batch_stream import NDJSONBatchRenderer
+from src.pdf_download import PDFDownloads
+from src.static_pages import StaticPages
 
 app = Flask(__name__)
 
 class WebInvoiceGenerator:
     def __init__(self):
-        self.config_manager = ConfigManager('config/settings.json')
-        self.pdf_generator = PDFGenerator(self.config_manager)
+        self.rendering_service = get_rendering_service('config/settings.json')
+        self.pdf_generator = self.rendering_service.pdf_generator
     
     def create_invoice_pdf(self, invoice_data):
         """Create invoice PDF from form data"""
+        invoice = self.build_invoice(invoice_data)
+        
+        # Generate PDF
+        pdf_path = self.rendering_service.generate_invoice(invoice)
+        return pdf_path
+    
+    def render_invoice_pdf(self, invoice_data):
+        """Render invoice PDF from form data in memory; returns (invoice_number, pdf_bytes)"""
+        invoice = self.build_invoice(invoice_data)
+        return invoice.invoice_number, self.rendering_service.render_invoice(invoice)
+    
+    def build_invoice(self, invoice_data):
+        """Build an Invoice model from form data"""
         
         # Create customer
         customer = Customer(
@@ -55,28 +72,49 @@ class WebInvoiceGenerator:
                 unit_price=Decimal(str(rate))
             ))
         
+        # Dates are printed without a time; whole days keep resubmitted forms identical for the PDF cache
+        issue_date = datetime.combine(date.today(), datetime.min.time())
+        
         # Create invoice
         invoice = Invoice(
             invoice_number=invoice_data['invoice_number'],
             customer=customer,
             items=items,
-            issue_date=datetime.now(),
-            due_date=datetime.now() + timedelta(days=int(invoice_data.get('payment_days', 30))),
+            issue_date=issue_date,
+            due_date=issue_date + timedelta(days=int(invoice_data.get('payment_days', 30))),
             tax_rate=Decimal('0.18'),  # Default GST
             discount_rate=Decimal(str(invoice_data.get('discount_rate', 0))) / Decimal('100'),
             notes=invoice_data.get('notes')
         )
-        
-        # Generate PDF
-        pdf_path = self.pdf_generator.generate_invoice(invoice)
-        return pdf_path
+        return invoice
+    
+    def create_batch_item(self, invoice_data):
+        """Create one invoice PDF of a /generate_batch stream; returns its result fields"""
+        pdf_path = self.create_invoice_pdf(invoice_data)
+        return {
+            'pdf_path': pdf_path,
+            'download_url': f'/download/{os.path.basename(pdf_path)}'
+        }
 
 web_generator = WebInvoiceGenerator()
+downloads = PDFDownloads.from_settings(web_generator.rendering_service.config_manager)
+
+# The form page is static: rendered, minified and compressed once here
+static_pages = StaticPages.from_settings(web_generator.rendering_service.config_manager)
+static_pages.load(app, ['invoice_form.html'])
+
+# Asynchronous variant of /generate_invoice: POST /jobs, GET /jobs/<id>, GET /jobs/<id>/pdf
+render_jobs = RenderJobQueue.from_settings(web_generator.rendering_service.config_manager,
+                                           web_generator.create_invoice_pdf)
+app.register_blueprint(create_jobs_blueprint(render_jobs, downloads))
+
+batch_renderer = NDJSONBatchRenderer.from_settings(web_generator.rendering_service.config_manager,
+                                                   web_generator.create_batch_item)
 
 @app.route('/')
 def index():
     """Main invoice form page"""
-    return render_template('invoice_form.html')
+    return static_pages.response('invoice_form.html')
 
 @app.route('/generate_invoice', methods=['POST'])
 def generate_invoice():
@@ -97,14 +135,50 @@ def generate_invoice():
             'error': str(e)
         })
 
+@app.route('/generate_batch', methods=['POST'])
+def generate_batch():
+    """
+    Generate many invoice PDFs from an NDJSON body (one /generate_invoice payload per line)
+    Results stream back as NDJSON while the body is still being read, one line
+    per invoice as it completes, followed by a summary line.
+    """
+    response = Response(stream_with_context(batch_renderer.stream(request.stream)),
+                        mimetype='application/x-ndjson')
+    # Keep proxies from holding the stream back
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/preview_invoice', methods=['POST'])
+def preview_invoice():
+    """Render invoice PDF in memory and stream it back (nothing is written to output/)"""
+    try:
+        invoice_number, pdf_bytes = web_generator.render_invoice_pdf(request.json)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    return send_file(
+        BytesIO(pdf_bytes),
+        mimetype='application/pdf',
+        as_attachment=request.args.get('download') == '1',
+        download_name=f"invoice_{invoice_number}.pdf"
+    )
+
+@app.route('/cache_stats')
+def cache_stats():
+    """Hit/miss counters of the rendered PDF cache"""
+    cache = web_generator.pdf_generator.cache
+    return jsonify({
+        'enabled': cache is not None,
+        **(cache.stats() if cache else {})
+    })
+
 @app.route('/download/<filename>')
 def download_file(filename):
-    """Download generated PDF"""
-    file_path = os.path.join('output', filename)
-    if os.path.exists(file_path):
-        return send_file(file_path, as_attachment=True)
-    else:
-        return "File not found", 404
+    """Download generated PDF (ETag, conditional and range requests)"""
+    return downloads.send('output', filename)
 
 if __name__ == '__main__':
     # Create templates directory